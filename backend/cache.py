@@ -0,0 +1,100 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+def scenario_key(scenario, projection_months: int) -> str:
+    # Só os campos que entram no cálculo: nome, pessoas e tecnologias não mudam o resultado
+    normalized = [
+        float(scenario.investment_cost) + 0.0,
+        float(scenario.monthly_operational_cost) + 0.0,
+        int(scenario.development_months),
+        float(scenario.monthly_return_estimate) + 0.0,
+        int(scenario.time_to_results_months),
+        int(projection_months)
+    ]
+    return hashlib.sha256(json.dumps(normalized).encode()).hexdigest()
+
+
+class ResultCache:
+    # LRU limitado por tamanho e com TTL; seguro para os handlers síncronos do threadpool
+    def __init__(self, max_size: int = 4096, ttl_seconds: float = 600.0, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
+
+
+def request_fingerprint(inputs, **params) -> str:
+    # Hash canônico de um pedido inteiro (cenários na ordem recebida + parâmetros de query)
+    payload = {
+        "inputs": [scenario.model_dump() for scenario in inputs],
+        "params": params
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def columns_fingerprint(names, columns, **params) -> str:
+    # Equivalente ao request_fingerprint para o corpo colunar, direto dos bytes dos arrays validados
+    digest = hashlib.sha256(json.dumps({"names": names, "params": params}, sort_keys=True, default=str).encode())
+    for field in sorted(columns):
+        digest.update(field.encode())
+        digest.update(columns[field].tobytes())
+    return digest.hexdigest()
@@ -0,0 +1,44 @@
+import io
+from typing import Dict, List
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet"
+}
+EXTENSIONS = {"arrow": "arrows", "parquet": "parquet"}
+
+
+def build_table(
+    names: List[str],
+    roi_data: Dict[str, np.ndarray],
+    monthly_profits: np.ndarray,
+    risk_index: np.ndarray,
+    risk_levels: List[str]
+) -> pa.Table:
+    # Colunas montadas direto dos arrays do ScenarioBatch; a série mensal vira uma lista de tamanho fixo
+    months = monthly_profits.shape[1]
+    series = pa.FixedSizeListArray.from_arrays(pa.array(np.ascontiguousarray(monthly_profits).ravel()), months)
+    return pa.table({
+        "scenario": pa.array(names, type=pa.string()),
+        "roi": pa.array(roi_data["roi"]),
+        "total_cost": pa.array(roi_data["total_cost"]),
+        "total_return": pa.array(roi_data["total_return"]),
+        "break_even_month": pa.array(roi_data["break_even_month"]),
+        "risk_level": pa.DictionaryArray.from_arrays(pa.array(risk_index, type=pa.int8()), pa.array(risk_levels)),
+        "monthly_profits": series
+    })
+
+
+def serialize(table: pa.Table, fmt: str) -> bytes:
+    sink = io.BytesIO()
+    if fmt == "parquet":
+        pq.write_table(table, sink)
+    else:
+        with ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue()
@@ -0,0 +1,119 @@
+import zlib
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+import config
+
+try:
+    import brotli
+except ImportError:  # sem brotli, só gzip é oferecido
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("text/csv", "application/json", "application/x-ndjson")
+# Acima disso a compressão sai do event loop e vai para o threadpool
+_OFFLOAD_BYTES = 64 * 1024
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    # Maior q entre br e gzip; empate fica com br, que comprime mais
+    offered = {}
+    for item in accept_encoding.split(","):
+        coding, _, parameters = item.strip().partition(";")
+        quality = 1.0
+        parameters = parameters.strip()
+        if parameters.startswith("q="):
+            try:
+                quality = float(parameters[2:])
+            except ValueError:
+                quality = 0.0
+        offered[coding.strip().lower()] = quality
+    candidates = [coding for coding in ("br", "gzip") if offered.get(coding, offered.get("*", 0.0)) > 0]
+    if brotli is None and "br" in candidates:
+        candidates.remove("br")
+    if not candidates:
+        return None
+    return max(candidates, key=lambda coding: offered.get(coding, offered.get("*", 0.0)))
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=config.BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(config.GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def process(self, data: bytes, final: bool) -> bytes:
+        # Cada bloco é descarregado por inteiro, para o streaming continuar entregando aos poucos
+        if self.encoding == "br":
+            output = self._brotli.process(data)
+            return output + (self._brotli.finish() if final else self._brotli.flush())
+        output = self._zlib.compress(data)
+        return output + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    # Como o GZipMiddleware do Starlette, mas com brotli, só para CSV/JSON e com ETag por codificação
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = config.COMPRESSION_MIN_BYTES if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+
+        start = None
+        compressor = None
+
+        async def send_compressed(message):
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "").split(";")[0].strip()
+                if content_type in COMPRESSIBLE_TYPES and "content-encoding" not in headers and message["status"] != 304:
+                    if encoding is not None:
+                        start = message
+                        return
+                    # A resposta depende do Accept-Encoding mesmo quando sai sem compressão
+                    MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+                await send(message)
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body and len(body) < self.minimum_size:
+                    await send(start)
+                    await send(message)
+                    start = None
+                    return
+                compressor = _Compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                if "etag" in headers:
+                    headers["ETag"] = headers["etag"][:-1] + f'-{encoding}"'
+                if more_body:
+                    del headers["Content-Length"]
+                body = await self._compress(compressor, body, not more_body)
+                if not more_body:
+                    headers["Content-Length"] = str(len(body))
+                await send(start)
+            else:
+                body = await self._compress(compressor, body, not more_body)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    async def _compress(compressor: _Compressor, body: bytes, final: bool) -> bytes:
+        if len(body) > _OFFLOAD_BYTES:
+            return await run_in_threadpool(compressor.process, body, final)
+        return compressor.process(body, final)
@@ -0,0 +1,72 @@
+import os
+import tempfile
+
+# Cache de resultados por cenário (/calculate, /export/pdf e /export/csv)
+RESULT_CACHE_SIZE = int(os.getenv("ROI_RESULT_CACHE_SIZE", "4096"))
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("ROI_RESULT_CACHE_TTL_SECONDS", "600"))
+
+# Streaming: cenários avaliados por vez e tamanho aproximado de cada bloco enviado do CSV
+STREAM_CHUNK_SCENARIOS = int(os.getenv("ROI_STREAM_CHUNK_SCENARIOS", "512"))
+CSV_STREAM_CHUNK_BYTES = int(os.getenv("ROI_CSV_STREAM_CHUNK_BYTES", str(256 * 1024)))
+
+# Pool de processos compartilhado pelas simulações e varreduras grandes
+PROCESS_POOL_WORKERS = int(os.getenv("ROI_PROCESS_POOL_WORKERS", str(os.cpu_count() or 1)))
+
+# Monte Carlo (/simulate)
+SIMULATION_MAX_DRAWS = int(os.getenv("ROI_SIMULATION_MAX_DRAWS", "10000000"))
+SIMULATION_CHUNK_DRAWS = int(os.getenv("ROI_SIMULATION_CHUNK_DRAWS", "250000"))
+SIMULATION_PARALLEL_THRESHOLD = int(os.getenv("ROI_SIMULATION_PARALLEL_THRESHOLD", "1000000"))
+SIMULATION_PERCENTILES = [5, 10, 25, 50, 75, 90, 95]
+
+# Varredura de parâmetros (/sweep)
+SWEEP_MAX_POINTS = int(os.getenv("ROI_SWEEP_MAX_POINTS", "50000000"))
+SWEEP_CHUNK_POINTS = int(os.getenv("ROI_SWEEP_CHUNK_POINTS", "1000000"))
+SWEEP_PARALLEL_THRESHOLD = int(os.getenv("ROI_SWEEP_PARALLEL_THRESHOLD", "4000000"))
+SWEEP_MAX_SURFACE_POINTS = int(os.getenv("ROI_SWEEP_MAX_SURFACE_POINTS", "250000"))
+
+# Goal-seek (/solve): limite da busca para prazos inteiros
+SOLVE_MAX_MONTHS = int(os.getenv("ROI_SOLVE_MAX_MONTHS", "1200"))
+
+# Seleção de portfólio (/portfolio/optimize): limite de nós do branch-and-bound
+PORTFOLIO_NODE_LIMIT = int(os.getenv("ROI_PORTFOLIO_NODE_LIMIT", "500000"))
+
+# Renderização de PDF: processos dedicados, renderizações simultâneas e linhas por tabela
+PDF_RENDER_WORKERS = int(os.getenv("ROI_PDF_RENDER_WORKERS", "2"))
+PDF_MAX_CONCURRENT_RENDERS = int(os.getenv("ROI_PDF_MAX_CONCURRENT_RENDERS", "4"))
+PDF_ROWS_PER_TABLE = int(os.getenv("ROI_PDF_ROWS_PER_TABLE", "20"))
+
+# Jobs de exportação assíncronos (/jobs): diretório dos artefatos, workers e validade
+JOBS_DIR = os.getenv("ROI_JOBS_DIR", os.path.join(tempfile.gettempdir(), "open-dataroi-jobs"))
+JOBS_WORKERS = int(os.getenv("ROI_JOBS_WORKERS", "2"))
+JOBS_TTL_SECONDS = float(os.getenv("ROI_JOBS_TTL_SECONDS", "3600"))
+
+# Profiling por requisição (operadores): desligado por padrão. Com o flag ligado, o header
+# X-Profile ou o parâmetro ?profile ativam o profiler; com ROI_PROFILING_TOKEN definido o valor
+# precisa ser igual ao token. ROI_PROFILING_SAMPLE_EVERY=N perfila 1 a cada N requisições.
+PROFILING_ENABLED = os.getenv("ROI_PROFILING_ENABLED", "0") == "1"
+PROFILING_TOKEN = os.getenv("ROI_PROFILING_TOKEN", "")
+PROFILING_SAMPLE_EVERY = int(os.getenv("ROI_PROFILING_SAMPLE_EVERY", "0"))
+PROFILING_DIR = os.getenv("ROI_PROFILING_DIR", os.path.join(tempfile.gettempdir(), "open-dataroi-profiles"))
+PROFILING_MAX_REPORTS = int(os.getenv("ROI_PROFILING_MAX_REPORTS", "50"))
+PROFILING_TOP_FUNCTIONS = int(os.getenv("ROI_PROFILING_TOP_FUNCTIONS", "30"))
+
+# Compressão das respostas CSV/JSON: tamanho mínimo e níveis (brotli só se o pacote estiver instalado)
+COMPRESSION_MIN_BYTES = int(os.getenv("ROI_COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("ROI_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("ROI_BROTLI_QUALITY", "4"))
+
+# Recalculo ao vivo por WebSocket (/ws/calculate): janela para juntar deltas e tamanho máximo da sessão
+LIVE_DEBOUNCE_MS = float(os.getenv("ROI_LIVE_DEBOUNCE_MS", "8"))
+LIVE_MAX_SCENARIOS = int(os.getenv("ROI_LIVE_MAX_SCENARIOS", "500"))
+
+# Servidor de produção (backend/server.py): workers, reciclagem e desligamento gracioso
+SERVER_HOST = os.getenv("ROI_SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("ROI_SERVER_PORT", "8000"))
+SERVER_WORKERS = int(os.getenv("ROI_SERVER_WORKERS", str(os.cpu_count() or 1)))
+SERVER_MAX_REQUESTS = int(os.getenv("ROI_SERVER_MAX_REQUESTS", "20000"))
+SERVER_GRACEFUL_SHUTDOWN_SECONDS = float(os.getenv("ROI_SERVER_GRACEFUL_SHUTDOWN_SECONDS", "30"))
+SERVER_KEEP_ALIVE_SECONDS = int(os.getenv("ROI_SERVER_KEEP_ALIVE_SECONDS", "5"))
+SERVER_FORWARDED_ALLOW_IPS = os.getenv("ROI_SERVER_FORWARDED_ALLOW_IPS", "127.0.0.1")
+SERVER_ACCESS_LOG = os.getenv("ROI_SERVER_ACCESS_LOG", "0") == "1"
+# Aquece pools e caches ao iniciar; o /readyz só responde 200 depois disso
+WARM_UP_ON_STARTUP = os.getenv("ROI_WARM_UP_ON_STARTUP", "1") == "1"
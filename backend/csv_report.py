@@ -0,0 +1,31 @@
+import csv
+import io
+from typing import Callable, Iterable, Optional
+
+HEADER = ["Scenario", "Month", "Profit"]
+
+
+def iter_csv(
+    projections: Iterable,
+    total: int,
+    chunk_bytes: int,
+    progress: Optional[Callable[[float], None]] = None
+):
+    # Gera o CSV em blocos de cenários: memória constante e primeiro byte cedo mesmo para lotes enormes
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(HEADER)
+
+    done = 0
+    for scenario, projection in projections:
+        name = getattr(scenario, "name", "unknown")
+        writer.writerows([name, month, profit] for month, profit in projection.csv_rows())
+        done += 1
+        if output.tell() >= chunk_bytes:
+            yield output.getvalue().encode()
+            output.seek(0)
+            output.truncate()
+            if progress is not None:
+                progress(done / total)
+
+    yield output.getvalue().encode()
@@ -1,7 +1,144 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import csv
 import io
-from fpdf import FPDF
+import numpy as np
+
+# Parâmetros que entram no cálculo (os demais campos do ROIInput não mudam o resultado)
+SCENARIO_FIELDS = (
+    "investment_cost",
+    "monthly_operational_cost",
+    "development_months",
+    "monthly_return_estimate",
+    "time_to_results_months"
+)
+INTEGER_SCENARIO_FIELDS = ("development_months", "time_to_results_months")
+
+# Maior mês representável; além disso o break-even é tratado como "nunca"
+_MAX_MONTH = 2 ** 62
+
+
+def _first_nonnegative(offset, slope, last):
+    # Menor k inteiro em [1, last] com offset + slope * k >= 0 (NaN se não existir)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        k = np.where(offset + slope >= 0, 1.0, np.where(slope > 0, np.ceil(-offset / slope), np.nan))
+        # a divisão pode errar por um mês no arredondamento; confere os vizinhos
+        k = np.where(offset + slope * k < 0, k + 1, k)
+        k = np.where((k > 1) & (offset + slope * (k - 1) >= 0), k - 1, k)
+    return np.where(k <= last, k, np.nan)
+
+
+# Desempate sequencial de quase-empates: até este mês, em blocos de no máximo _TIE_BLOCK células (cenários x meses)
+_TIE_MAX_MONTH = 2 ** 20
+_TIE_BLOCK = 2 ** 22
+
+
+def _sequential_first(investment_cost, monthly_operational_cost, cost_months, margin, last_month):
+    # Primeiro mês com lucro acumulado >= custo acumulado, somando mês a mês como _cumulative (e a série
+    # monthly_profits): em quase-empates a soma sequencial pode cair do outro lado da fórmula fechada
+    months = np.arange(1, last_month + 1)
+    returning = months > cost_months[:, None]
+    cost_steps = np.empty((len(cost_months), last_month + 1))
+    cost_steps[:, 0] = investment_cost
+    cost_steps[:, 1:] = np.where(returning, 0.0, monthly_operational_cost[:, None])
+    cost = np.cumsum(cost_steps, axis=1)[:, 1:]
+    profit = np.cumsum(np.where(returning, margin[:, None], 0.0), axis=1)
+    reached = profit >= cost
+    return np.where(reached.any(axis=1), reached.argmax(axis=1) + 1.0, np.nan)
+
+
+def _settle_ties(month, investment_cost, monthly_operational_cost, cost_months, frozen_cost, margin):
+    # A fórmula fechada é exata em aritmética real; quando o acumulado no mês encontrado (ou no anterior)
+    # fica a poucos ulps de zero, refaz esses cenários com a soma sequencial
+    returns = month - cost_months
+    with np.errstate(invalid="ignore", over="ignore"):
+        tolerance = 1e-9 * (np.abs(frozen_cost) + np.abs(margin) * returns)
+        near = (np.abs(margin * returns - frozen_cost) <= tolerance) | (np.abs(margin * (returns - 1) - frozen_cost) <= tolerance)
+    near &= np.isfinite(month) & (returns >= 1) & (month <= _TIE_MAX_MONTH)
+    if not near.any():
+        return month
+
+    shape = np.shape(month)
+    near, month, investment_cost, monthly_operational_cost, cost_months, margin = (
+        np.array(values).reshape(-1)
+        for values in np.broadcast_arrays(near, month, investment_cost, monthly_operational_cost, cost_months, margin)
+    )
+    ties = np.flatnonzero(near)
+    rows = max(int(_TIE_BLOCK // (month[ties].max() + 1)), 1)
+    for start in range(0, len(ties), rows):
+        block = ties[start:start + rows]
+        settled = _sequential_first(
+            investment_cost[block],
+            monthly_operational_cost[block],
+            cost_months[block],
+            margin[block],
+            int(month[block].max()) + 1
+        )
+        month[block] = np.where(np.isnan(settled), month[block], settled)
+    return month.reshape(shape)
+
+
+def solve_break_even_month(
+    investment_cost,
+    monthly_operational_cost,
+    development_months,
+    monthly_return_estimate,
+    time_to_results_months,
+    horizon: Optional[int] = None
+) -> np.ndarray:
+    # Break-even analítico (O(1) por cenário), vetorizado sobre arrays de parâmetros.
+    # O acumulado é linear por partes: só custos até o início dos retornos
+    # (max(development_months + 1, time_to_results_months)), depois ganha (retorno - custo) por mês.
+    investment_cost = np.asarray(investment_cost, dtype=np.float64)
+    monthly_operational_cost = np.asarray(monthly_operational_cost, dtype=np.float64)
+    monthly_return_estimate = np.asarray(monthly_return_estimate, dtype=np.float64)
+    first_return_month = np.maximum(
+        np.maximum(np.asarray(development_months, dtype=np.int64) + 1, time_to_results_months), 1
+    )
+    cost_months = (first_return_month - 1).astype(np.float64)
+
+    # Fase de custo: lucro 0 contra custo investment + operational * m
+    cost_phase = _first_nonnegative(-investment_cost, -monthly_operational_cost, cost_months)
+
+    # Fase de retorno: custo congelado, lucro cresce (retorno - custo operacional) por mês
+    frozen_cost = investment_cost + monthly_operational_cost * cost_months
+    margin = monthly_return_estimate - monthly_operational_cost
+    return_phase = cost_months + _first_nonnegative(-frozen_cost, margin, np.inf)
+    return_phase = _settle_ties(return_phase, investment_cost, monthly_operational_cost, cost_months, frozen_cost, margin)
+
+    month = np.where(np.isnan(cost_phase), return_phase, cost_phase)
+    if horizon is not None:
+        month = np.where(month <= horizon, month, np.nan)
+    return np.where(month <= _MAX_MONTH, month, -1).astype(np.int64)
+
+class CashFlowProjection:
+    # Resultado de um cenário para um horizonte: tudo que os endpoints e exportações precisam
+    def __init__(
+        self,
+        projection_months: int,
+        total_cost: float,
+        total_return: float,
+        roi: float,
+        break_even_month: int,
+        monthly_profits: np.ndarray
+    ):
+        self.projection_months = projection_months
+        self.total_cost = total_cost
+        self.total_return = total_return
+        self.roi = roi
+        self.break_even_month = break_even_month
+        self.monthly_profits = monthly_profits
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "total_cost": self.total_cost,
+            "total_return": self.total_return,
+            "roi": self.roi,
+            "break_even_month": self.break_even_month
+        }
+
+    def csv_rows(self):
+        return enumerate(self.monthly_profits.tolist(), start=1)
+
 
 class DataInitiativeROI:
     def __init__(
@@ -21,28 +158,36 @@ class DataInitiativeROI:
         self.monthly_return_estimate = monthly_return_estimate
         self.time_to_results_months = time_to_results_months
         self.technologies = technologies
+        self._projections: Dict[int, CashFlowProjection] = {}
 
     def total_cost(self) -> float:
         return self.investment_cost + (self.monthly_operational_cost * self.development_months)
 
+    def projection(self, projection_months: int = 24) -> CashFlowProjection:
+        # Calculada uma única vez por horizonte e reaproveitada por ROI, break-even, CSV e PDF
+        if projection_months not in self._projections:
+            self._projections[projection_months] = ScenarioBatch.from_scenarios([self]).projections(projection_months)[0]
+        return self._projections[projection_months]
+
     def estimate_roi(self, projection_months: int = 24) -> Dict[str, float]:
-        total_cost = self.total_cost()
-        profit_months = max(projection_months - self.time_to_results_months, 0)
-        total_return = profit_months * self.monthly_return_estimate
-        roi = (total_return - total_cost) / total_cost if total_cost else 0
+        return self.projection(projection_months).summary()
 
-        return {
-            "total_cost": total_cost,
-            "total_return": total_return,
-            "roi": roi,
-            "break_even_month": self._calculate_break_even_month()
-        }
+    def _calculate_break_even_month(self, horizon: Optional[int] = None) -> int:
+        return int(solve_break_even_month(
+            self.investment_cost,
+            self.monthly_operational_cost,
+            self.development_months,
+            self.monthly_return_estimate,
+            self.time_to_results_months,
+            horizon
+        ))
 
-    def _calculate_break_even_month(self) -> int:
+    def _calculate_break_even_month_reference(self, horizon: int = 60) -> int:
+        # Versão original mês a mês, mantida como referência para os testes de equivalência
         cumulative_profit = 0
         cumulative_cost = self.investment_cost
 
-        for month in range(1, 61):  # até 5 anos
+        for month in range(1, horizon + 1):
             if month <= self.development_months:
                 cumulative_cost += self.monthly_operational_cost
             elif month >= self.time_to_results_months:
@@ -58,23 +203,14 @@ class DataInitiativeROI:
         output = io.StringIO()
         writer = csv.writer(output)
         writer.writerow(["Mês", "Lucro Acumulado"])
-
-        profit = 0
-        cost = self.investment_cost
-
-        for i in range(1, projection_months + 1):
-            if i <= self.development_months:
-                cost += self.monthly_operational_cost
-            elif i >= self.time_to_results_months:
-                profit += self.monthly_return_estimate - self.monthly_operational_cost
-            else:
-                cost += self.monthly_operational_cost
-
-            writer.writerow([i, profit - cost])
+        writer.writerows(self.projection(projection_months).csv_rows())
 
         return output.getvalue()
 
     def export_to_pdf(self, roi_result: Dict[str, float]) -> bytes:
+        # fpdf só é carregado quando alguém realmente exporta PDF
+        from fpdf import FPDF
+
         pdf = FPDF()
         pdf.add_page()
         pdf.set_font("Arial", size=12)
@@ -86,3 +222,124 @@ class DataInitiativeROI:
             pdf.cell(200, 10, txt=f"{key.replace('_', ' ').capitalize()}: {value:.2f}", ln=True)
 
         return pdf.output(dest='S').encode('latin1')
+
+
+class ScenarioBatch:
+    # Avalia vários cenários de uma vez: cada parâmetro vira um array com uma posição por cenário
+    def __init__(
+        self,
+        investment_cost,
+        monthly_operational_cost,
+        development_months,
+        monthly_return_estimate,
+        time_to_results_months
+    ):
+        self.investment_cost = np.asarray(investment_cost, dtype=np.float64)
+        self.monthly_operational_cost = np.asarray(monthly_operational_cost, dtype=np.float64)
+        self.development_months = np.asarray(development_months, dtype=np.int64)
+        self.monthly_return_estimate = np.asarray(monthly_return_estimate, dtype=np.float64)
+        self.time_to_results_months = np.asarray(time_to_results_months, dtype=np.int64)
+
+    @classmethod
+    def from_scenarios(cls, scenarios) -> "ScenarioBatch":
+        # Aceita qualquer objeto com os atributos do modelo (ROIInput, DataInitiativeROI, ...)
+        return cls(
+            investment_cost=[s.investment_cost for s in scenarios],
+            monthly_operational_cost=[s.monthly_operational_cost for s in scenarios],
+            development_months=[s.development_months for s in scenarios],
+            monthly_return_estimate=[s.monthly_return_estimate for s in scenarios],
+            time_to_results_months=[s.time_to_results_months for s in scenarios]
+        )
+
+    def __len__(self) -> int:
+        return len(self.investment_cost)
+
+    def total_cost(self) -> np.ndarray:
+        return self.investment_cost + (self.monthly_operational_cost * self.development_months)
+
+    def estimate_roi(self, projection_months: int = 24, include_break_even: bool = True) -> Dict[str, np.ndarray]:
+        # include_break_even=False pula a parte mais cara quando o chamador não precisa do break-even
+        total_cost = self.total_cost()
+        profit_months = np.maximum(projection_months - self.time_to_results_months, 0)
+        total_return = profit_months * self.monthly_return_estimate
+        roi = np.divide(
+            total_return - total_cost,
+            total_cost,
+            out=np.zeros_like(total_cost),
+            where=total_cost != 0
+        )
+
+        result = {
+            "total_cost": total_cost,
+            "total_return": total_return,
+            "roi": roi
+        }
+        if include_break_even:
+            result["break_even_month"] = self._calculate_break_even_month()
+        return result
+
+    def _cumulative(self, projection_months: int):
+        # Mesma recorrência de DataInitiativeROI, acumulada mês a mês com cumsum para manter o mesmo arredondamento
+        months = np.arange(1, max(projection_months, 0) + 1)
+        returning = (months > self.development_months[:, None]) & (months >= self.time_to_results_months[:, None])
+
+        cost_steps = np.empty((len(self), len(months) + 1))
+        cost_steps[:, 0] = self.investment_cost
+        cost_steps[:, 1:] = np.where(returning, 0.0, self.monthly_operational_cost[:, None])
+        cost = np.cumsum(cost_steps, axis=1)[:, 1:]
+
+        margin = self.monthly_return_estimate - self.monthly_operational_cost
+        profit = np.cumsum(np.where(returning, margin[:, None], 0.0), axis=1)
+        return profit, cost
+
+    def cumulative_profits(self, projection_months: int = 24) -> np.ndarray:
+        profit, cost = self._cumulative(projection_months)
+        profit -= cost
+        return profit
+
+    def projections(self, projection_months: int = 24) -> List[CashFlowProjection]:
+        roi_data = self.estimate_roi(projection_months)
+        monthly_profits = self.cumulative_profits(projection_months)
+        return [
+            CashFlowProjection(projection_months, total_cost, total_return, roi, break_even_month, profits)
+            for total_cost, total_return, roi, break_even_month, profits in zip(
+                roi_data["total_cost"].tolist(),
+                roi_data["total_return"].tolist(),
+                roi_data["roi"].tolist(),
+                roi_data["break_even_month"].tolist(),
+                monthly_profits
+            )
+        ]
+
+    def _calculate_break_even_month(self, horizon: Optional[int] = None) -> np.ndarray:
+        return solve_break_even_month(
+            self.investment_cost,
+            self.monthly_operational_cost,
+            self.development_months,
+            self.monthly_return_estimate,
+            self.time_to_results_months,
+            horizon
+        )
+
+
+def project_scenarios(models: List[DataInitiativeROI], projection_months: int = 24) -> List[CashFlowProjection]:
+    # Calcula em lote só as projeções que ainda não estão memorizadas nos modelos
+    pending = [model for model in models if projection_months not in model._projections]
+    if pending:
+        for model, projection in zip(pending, ScenarioBatch.from_scenarios(pending).projections(projection_months)):
+            model._projections[projection_months] = projection
+    return [model.projection(projection_months) for model in models]
+
+
+def roi_over_time(monthly_profits: np.ndarray, total_cost: np.ndarray) -> np.ndarray:
+    # ROI (%) mês a mês sobre o custo total, como o gráfico do frontend; zero quando o custo não é positivo
+    monthly_profits = np.asarray(monthly_profits, dtype=np.float64)
+    total_cost = np.asarray(total_cost, dtype=np.float64)[..., None]
+    ratio = np.divide(monthly_profits, total_cost, out=np.zeros_like(monthly_profits), where=total_cost > 0)
+    return ratio * 100
+
+
+def payback(monthly_profits: np.ndarray, total_cost: np.ndarray) -> np.ndarray:
+    # Payback acumulado do gráfico do frontend: soma corrente da série menos o custo total
+    monthly_profits = np.asarray(monthly_profits, dtype=np.float64)
+    return np.cumsum(monthly_profits, axis=-1) - np.asarray(total_cost, dtype=np.float64)[..., None]
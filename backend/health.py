@@ -0,0 +1,29 @@
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+
+class Readiness:
+    # Etapas de aquecimento do worker; pronto quando todas terminaram sem erro
+    def __init__(self, checks: Iterable[str] = ()):
+        self._lock = threading.Lock()
+        self._checks: Dict[str, Dict] = {name: {"ok": False, "detail": "pending"} for name in checks}
+        self.started_at = time.time()
+
+    def mark(self, name: str, ok: bool, detail: Optional[str] = None) -> None:
+        with self._lock:
+            self._checks[name] = {"ok": ok, "detail": detail}
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return bool(self._checks) and all(check["ok"] for check in self._checks.values())
+
+    def report(self) -> Dict:
+        with self._lock:
+            checks = {name: dict(check) for name, check in self._checks.items()}
+        return {
+            "ready": bool(checks) and all(check["ok"] for check in checks.values()),
+            "uptime_seconds": time.time() - self.started_at,
+            "checks": checks
+        }
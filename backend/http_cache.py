@@ -0,0 +1,43 @@
+import hashlib
+from typing import Optional
+
+from fastapi.responses import Response
+
+# Incrementar quando o conteúdo gerado para o mesmo pedido mudar (formato de exportação, cálculo...)
+ETAG_VERSION = "1"
+# Sufixos que o CompressionMiddleware acrescenta à ETag da versão comprimida
+ENCODING_SUFFIXES = ("-br", "-gzip")
+
+
+def etag(route: str, fingerprint: str, weak: bool = False) -> str:
+    # ETag forte: mesmo pedido normalizado (cenários + parâmetros) na mesma rota gera os mesmos bytes.
+    # Fraca quando o corpo muda entre respostas equivalentes (ex.: a data de geração do PDF)
+    digest = hashlib.sha256(f"{ETAG_VERSION}:{route}:{fingerprint}".encode()).hexdigest()[:40]
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def _base_tag(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(f'{suffix}"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+def matching_tag(if_none_match: Optional[str], tag: str) -> Optional[str]:
+    # If-None-Match usa comparação fraca, e qualquer codificação da mesma representação vale.
+    # Devolve a ETag da representação que o cliente tem (com o sufixo da codificação), ou None
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return tag
+    for candidate in if_none_match.split(","):
+        if _base_tag(candidate) == _base_tag(tag):
+            return candidate.strip()
+    return None
+
+
+def not_modified(tag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": tag, "Vary": "Accept-Encoding"})
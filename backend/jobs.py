@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+# Intervalo mínimo entre varreduras de jobs expirados
+_PURGE_INTERVAL_SECONDS = 60.0
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class IdempotencyConflict(Exception):
+    pass
+
+
+class JobStore:
+    # Estado e artefatos ficam em disco, então qualquer worker do mesmo host responde ao polling
+    def __init__(self, directory: str, workers: int = 2, ttl_seconds: float = 3600.0):
+        self.directory = directory
+        self.workers = workers
+        self.ttl_seconds = ttl_seconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+        self._queued: Dict[Future, Dict] = {}
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _write(self, job: Dict) -> None:
+        job["updated_at"] = time.time()
+        temporary = self._path(f"{job['id']}.json.tmp-{threading.get_ident()}")
+        with open(temporary, "w") as output:
+            json.dump(job, output)
+        os.replace(temporary, self._path(f"{job['id']}.json"))
+
+    def _executor_or_start(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._executor = ThreadPoolExecutor(max_workers=max(self.workers, 1), thread_name_prefix="export-job")
+            return self._executor
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        if not _JOB_ID.match(job_id):
+            return None
+        try:
+            with open(self._path(f"{job_id}.json")) as source:
+                job = json.load(source)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if job["expires_at"] <= time.time():
+            self._delete(job)
+            return None
+        return job
+
+    def artifact_path(self, job: Dict) -> str:
+        return self._path(f"{job['id']}.{job['extension']}")
+
+    def submit(
+        self,
+        kind: str,
+        extension: str,
+        media_type: str,
+        task: Callable,
+        fingerprint: str,
+        idempotency_key: Optional[str] = None
+    ) -> Tuple[Dict, bool]:
+        executor = self._executor_or_start()
+        self.purge_expired()
+
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "queued",
+            "progress": 0.0,
+            "created_at": now,
+            "expires_at": now + self.ttl_seconds,
+            "extension": extension,
+            "media_type": media_type,
+            "size_bytes": None,
+            "error": None,
+            "fingerprint": fingerprint,
+            "idempotency_key": idempotency_key
+        }
+
+        if idempotency_key is not None:
+            existing = self._claim_key(idempotency_key, job["id"])
+            if existing is not None:
+                if existing["fingerprint"] != fingerprint:
+                    raise IdempotencyConflict("Idempotency-Key was already used with a different request")
+                return existing, False
+
+        self._write(job)
+        future = executor.submit(self._run, job, task)
+        with self._lock:
+            self._queued[future] = job
+        future.add_done_callback(self._forget)
+        return job, True
+
+    def _forget(self, future: Future) -> None:
+        with self._lock:
+            self._queued.pop(future, None)
+
+    def _key_path(self, idempotency_key: str) -> str:
+        return self._path(f"key-{hashlib.sha256(idempotency_key.encode()).hexdigest()}")
+
+    def _claim_key(self, idempotency_key: str, job_id: str) -> Optional[Dict]:
+        # O_EXCL garante um único dono da chave mesmo entre processos; jobs com falha ou expirados são refeitos
+        path = self._key_path(idempotency_key)
+        with self._lock:
+            try:
+                descriptor = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                with open(path) as source:
+                    existing = self.get(source.read().strip())
+                if existing is not None and existing["status"] != "failed":
+                    return existing
+                with open(f"{path}.tmp", "w") as output:
+                    output.write(job_id)
+                os.replace(f"{path}.tmp", path)
+                return None
+            with os.fdopen(descriptor, "w") as output:
+                output.write(job_id)
+            return None
+
+    def _run(self, job: Dict, task: Callable) -> None:
+        job["status"] = "running"
+        self._write(job)
+
+        def progress(fraction: float) -> None:
+            job["progress"] = round(min(max(fraction, 0.0), 1.0), 4)
+            self._write(job)
+
+        partial = self.artifact_path(job) + ".part"
+        try:
+            with open(partial, "wb") as output:
+                task(output, progress)
+            os.replace(partial, self.artifact_path(job))
+            job["status"] = "done"
+            job["progress"] = 1.0
+            job["size_bytes"] = os.path.getsize(self.artifact_path(job))
+        except Exception as error:
+            job["status"] = "failed"
+            job["error"] = str(error)
+            if os.path.exists(partial):
+                os.remove(partial)
+        self._write(job)
+
+    def _delete(self, job: Dict) -> None:
+        paths = [self._path(f"{job['id']}.json"), self.artifact_path(job)]
+        if job.get("idempotency_key") is not None:
+            key_path = self._key_path(job["idempotency_key"])
+            try:
+                with open(key_path) as source:
+                    if source.read().strip() == job["id"]:
+                        paths.append(key_path)
+            except FileNotFoundError:
+                pass
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def purge_expired(self, force: bool = False) -> None:
+        now = time.time()
+        if not force and now - self._last_purge < _PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = now
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                self.get(name[:-len(".json")])
+
+    def shutdown(self) -> None:
+        # Jobs que ainda não começaram viram "failed": o cliente para de esperar e a mesma Idempotency-Key refaz o job
+        with self._lock:
+            executor, self._executor = self._executor, None
+            queued, self._queued = list(self._queued.items()), {}
+        for future, job in queued:
+            if future.cancel():
+                job["status"] = "failed"
+                job["error"] = "Server shut down before the job started"
+                self._write(job)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
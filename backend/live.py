@@ -0,0 +1,127 @@
+import asyncio
+import json
+import time
+from typing import Callable, List, Optional
+
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+import metrics
+import serialization
+from models import ROIInput
+from shaping import ResponseShape
+
+Compute = Callable[[List[ROIInput], int, ResponseShape], List[dict]]
+
+
+class LiveSession:
+    # Estado de uma conexão: o conjunto de cenários, o horizonte e o formato da resposta.
+    # Cada delta é aplicado na hora; o cálculo só enxerga o estado mais recente.
+    def __init__(self, max_scenarios: int):
+        self.max_scenarios = max_scenarios
+        self.scenarios: Optional[List[ROIInput]] = None
+        self.projection_months = 60
+        self.shape = ResponseShape()
+        self.seq = None
+
+    def _set_options(self, message: dict) -> None:
+        if "projection_months" in message:
+            months = message["projection_months"]
+            if not isinstance(months, int) or isinstance(months, bool) or months < 0:
+                raise ValueError("projection_months must be a non-negative integer")
+            self.projection_months = months
+        if any(key in message for key in ("fields", "series", "precision")):
+            # Mesmas regras dos parâmetros de query do /calculate
+            fields = message.get("fields", ",".join(self.shape.fields))
+            series = message.get("series", self.shape.series)
+            precision = message.get("precision", self.shape.precision)
+            if not isinstance(fields, str):
+                raise ValueError("fields must be a comma-separated string")
+            if not isinstance(series, str):
+                raise ValueError("series must be a string")
+            if precision is not None and (not isinstance(precision, int) or isinstance(precision, bool) or not 0 <= precision <= 15):
+                raise ValueError("precision must be an integer between 0 and 15")
+            self.shape = ResponseShape.from_query(fields, series, precision)
+
+    def apply(self, message: dict) -> None:
+        kind = message.get("type")
+        if kind == "init":
+            scenarios = message.get("scenarios")
+            if not isinstance(scenarios, list):
+                raise ValueError("init requires a scenarios list")
+            if len(scenarios) > self.max_scenarios:
+                raise ValueError(f"At most {self.max_scenarios} scenarios per live session")
+            if not all(isinstance(scenario, dict) for scenario in scenarios):
+                raise ValueError("Each scenario must be an object")
+            validated = [ROIInput(**scenario) for scenario in scenarios]
+            self._set_options(message)
+            self.scenarios = validated
+        elif kind == "update":
+            if self.scenarios is None:
+                raise ValueError("Send an init message before updates")
+            scenarios = list(self.scenarios)
+            changes = message.get("changes", [])
+            if not isinstance(changes, list):
+                raise ValueError("changes must be a list")
+            for change in changes:
+                if not isinstance(change, dict) or not isinstance(change.get("values", {}), dict):
+                    raise ValueError("Each change must be an object with an index and a values object")
+                index = change.get("index")
+                if not isinstance(index, int) or isinstance(index, bool) or not 0 <= index < len(scenarios):
+                    raise ValueError(f"Unknown scenario index: {index}")
+                scenarios[index] = ROIInput(**{**scenarios[index].model_dump(), **change.get("values", {})})
+            self._set_options(message)
+            self.scenarios = scenarios
+        else:
+            raise ValueError(f"Unknown message type: {kind}")
+        self.seq = message.get("seq", self.seq)
+
+
+async def serve(websocket: WebSocket, compute: Compute, debounce_seconds: float, max_scenarios: int) -> None:
+    # Recebimento e cálculo em tarefas separadas: enquanto um lote é calculado, os deltas que chegam
+    # só atualizam a sessão, e o próximo cálculo cobre todos eles de uma vez
+    await websocket.accept()
+    session = LiveSession(max_scenarios)
+    dirty = asyncio.Event()
+
+    async def receive_deltas():
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+            message = None
+            try:
+                message = json.loads(frame.get("text") or frame.get("bytes") or "")
+                if not isinstance(message, dict):
+                    raise ValueError("Messages must be JSON objects")
+                session.apply(message)
+            except (ValueError, ValidationError) as error:
+                await websocket.send_json({"type": "error", "seq": message.get("seq") if isinstance(message, dict) else None, "detail": str(error)})
+                continue
+            dirty.set()
+
+    receiver = asyncio.create_task(receive_deltas())
+    metrics.LIVE_SESSIONS.inc()
+    try:
+        while True:
+            waiter = asyncio.create_task(dirty.wait())
+            done, _ = await asyncio.wait({receiver, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                waiter.cancel()
+                receiver.result()
+            # Janela curta para juntar a rajada de deltas de um slider sendo arrastado
+            await asyncio.sleep(debounce_seconds)
+            dirty.clear()
+            scenarios, projection_months, shape, seq = session.scenarios, session.projection_months, session.shape, session.seq
+            started = time.perf_counter()
+            results = await run_in_threadpool(compute, scenarios, projection_months, shape)
+            elapsed = time.perf_counter() - started
+            metrics.LIVE_UPDATE_DURATION.observe(elapsed)
+            payload = {"type": "result", "seq": seq, "compute_ms": elapsed * 1000, "results": results}
+            await websocket.send_text(serialization.dumps_json(payload).decode())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        metrics.LIVE_SESSIONS.dec()
@@ -1,160 +1,586 @@
-from fastapi import FastAPI, Query
-from fastapi.responses import StreamingResponse
-from typing import List
-import io
-import csv
-from estimator import DataInitiativeROI
-from models import ROIInput
+from fastapi import FastAPI, Header, HTTPException, Query, Request, WebSocket
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Callable, List, Literal, Optional, Tuple
+import asyncio
+from contextlib import asynccontextmanager
+import os
+import threading
+import json
+import numpy as np
+from estimator import SCENARIO_FIELDS, CashFlowProjection, DataInitiativeROI, ScenarioBatch, project_scenarios
+from models import PortfolioInput, ROIInput, SimulationInput, SolveInput, SweepInput, parse_columnar_input
+from cache import ResultCache, columns_fingerprint, request_fingerprint, scenario_key
+from compression import CompressionMiddleware
+from jobs import IdempotencyConflict, JobStore
+import config
+import http_cache
+from health import Readiness
+import live
+import metrics
+import pools
+import profiling
+import serialization
+from shaping import ResponseShape
+import portfolio
+import simulation
+import solver
+import sweep
 from datetime import datetime
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-from estimator import DataInitiativeROI
+import time
 
 
-app = FastAPI()
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Aquecimento em segundo plano: o /healthz responde desde já, o /readyz só depois de aquecer
+    if config.WARM_UP_ON_STARTUP:
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    else:
+        for check in WARM_UP_CHECKS:
+            readiness.mark(check, True, "warm-up disabled")
+    yield
+    export_jobs.shutdown()
+    pools.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+result_cache = ResultCache(max_size=config.RESULT_CACHE_SIZE, ttl_seconds=config.RESULT_CACHE_TTL_SECONDS)
+pdf_render_slots = asyncio.Semaphore(max(config.PDF_MAX_CONCURRENT_RENDERS, 1))
+export_jobs = JobStore(config.JOBS_DIR, workers=config.JOBS_WORKERS, ttl_seconds=config.JOBS_TTL_SECONDS)
+WARM_UP_CHECKS = ("result_cache", "process_pool", "pdf_renderer", "export_jobs")
+readiness = Readiness(WARM_UP_CHECKS)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(profiling.ProfilingMiddleware)
+
+for _stat, _kind in (("size", "gauge"), ("hits", "counter"), ("misses", "counter"), ("evictions", "counter"), ("expirations", "counter")):
+    metrics.REGISTRY.callback(
+        f"roi_result_cache_{_stat}" + ("_total" if _kind == "counter" else ""),
+        f"Result cache {_stat}.",
+        _kind,
+        lambda stat=_stat: result_cache.stats()[stat]
+    )
+for _pool in ("process", "pdf"):
+    metrics.REGISTRY.callback(
+        f"roi_{_pool}_pool_workers",
+        f"Workers started in the {_pool} pool (0 until first use).",
+        "gauge",
+        lambda pool=_pool: pools.stats()[pool]
+    )
+
+def _build_model(scenario: ROIInput) -> DataInitiativeROI:
+    return DataInitiativeROI(
+        investment_cost=scenario.investment_cost,
+        monthly_operational_cost=scenario.monthly_operational_cost,
+        num_people=scenario.num_people,
+        development_months=scenario.development_months,
+        monthly_return_estimate=scenario.monthly_return_estimate,
+        time_to_results_months=scenario.time_to_results_months,
+        technologies=scenario.technologies
+    )
+
+
+def _project(inputs: List[ROIInput], projection_months: int) -> List[CashFlowProjection]:
+    keys = [scenario_key(scenario, projection_months) for scenario in inputs]
+
+    # Cenários idênticos no mesmo lote são calculados uma única vez
+    projections = {}
+    pending = {}
+    for key, scenario in zip(keys, inputs):
+        if key in projections or key in pending:
+            continue
+        cached = result_cache.get(key)
+        if cached is None:
+            pending[key] = scenario
+        else:
+            projections[key] = cached
+
+    if pending:
+        computed = project_scenarios([_build_model(scenario) for scenario in pending.values()], projection_months)
+        for key, projection in zip(pending, computed):
+            # cópia própria da série para o cache não prender a matriz do lote inteiro
+            projection.monthly_profits = projection.monthly_profits.copy()
+            result_cache.put(key, projection)
+            projections[key] = projection
+
+    return [projections[key] for key in keys]
+
+
+def _iter_projections(inputs: List[ROIInput], projection_months: int):
+    # Avalia o lote em partes, entregando cada cenário assim que a sua parte fica pronta
+    chunk_size = max(config.STREAM_CHUNK_SCENARIOS, 1)
+    for start in range(0, len(inputs), chunk_size):
+        chunk = inputs[start:start + chunk_size]
+        yield from zip(chunk, _project(chunk, projection_months))
+
+
+def _results(inputs: List[ROIInput], projection_months: int, shape: ResponseShape) -> List[dict]:
+    names = [getattr(scenario, "name", "unknown") for scenario in inputs]
+    if not shape.needs_series or not shape.needs_break_even:
+        # Sem série, ou sem break-even: o lote vetorizado calcula só o que foi pedido. As projeções
+        # do cache sempre trazem série e break-even, então ficam para quando ambos são pedidos
+        batch = ScenarioBatch.from_scenarios(inputs)
+        values = batch.estimate_roi(projection_months, include_break_even=shape.needs_break_even)
+        series = batch.cumulative_profits(projection_months) if shape.needs_series else None
+        return shape.rows(names, values, series)
+
+    projections = _project(inputs, projection_months)
+    values = {
+        "roi": [projection.roi for projection in projections],
+        "total_cost": [projection.total_cost for projection in projections],
+        "total_return": [projection.total_return for projection in projections],
+        "break_even_month": [projection.break_even_month for projection in projections]
+    }
+    return shape.rows(names, values, [projection.monthly_profits for projection in projections])
+
+
+def _iter_ndjson(inputs: List[ROIInput], projection_months: int, shape: ResponseShape):
+    # Uma linha JSON por cenário, enviadas a cada bloco avaliado
+    chunk_size = max(config.STREAM_CHUNK_SCENARIOS, 1)
+    for start in range(0, len(inputs), chunk_size):
+        rows = _results(inputs[start:start + chunk_size], projection_months, shape)
+        yield b"\n".join(serialization.dumps_json(row) for row in rows) + b"\n"
+
+
+def _observe_batch(route: str, inputs: List[ROIInput], projection_months: int) -> None:
+    metrics.SCENARIOS_PER_REQUEST.observe(len(inputs), route)
+    metrics.MONTHS_PER_REQUEST.observe(projection_months, route)
+
+
+def _wants_ndjson(request: Request, stream: bool) -> bool:
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _response_shape(fields: Optional[str], series: str, precision: Optional[int]) -> ResponseShape:
+    try:
+        return ResponseShape.from_query(fields, series, precision)
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error))
+
+
+def _conditional(request: Request, route: str, fingerprint: str, weak: bool = False) -> Tuple[str, Optional[Response]]:
+    # Devolve a ETag do pedido e, se o cliente já tem essa versão, o 304 pronto (antes de calcular qualquer coisa)
+    tag = http_cache.etag(route, fingerprint, weak)
+    cached = http_cache.matching_tag(request.headers.get("if-none-match"), tag)
+    if cached is not None:
+        return tag, http_cache.not_modified(cached)
+    return tag, None
+
+
+def _response_media_type(request: Request) -> str:
+    media_type = serialization.negotiate(request.headers.get("accept"))
+    if media_type != serialization.JSON_MEDIA_TYPE and not serialization.msgpack_available():
+        raise HTTPException(status_code=406, detail="MessagePack responses require msgpack to be installed")
+    return media_type
+
 
 @app.post("/calculate")
-def calculate_roi(inputs: List[ROIInput], projection_months: int = Query(60)):
-    results = []
-    for scenario in inputs:
-        model = DataInitiativeROI(
- 
-            investment_cost=scenario.investment_cost,
-            monthly_operational_cost=scenario.monthly_operational_cost,
-            num_people=scenario.num_people,
-            development_months=scenario.development_months,
-            monthly_return_estimate=scenario.monthly_return_estimate,
-            time_to_results_months=scenario.time_to_results_months,
-            technologies=scenario.technologies
-        )
-        roi_data = model.estimate_roi(projection_months)
-
-        # Calcular lucros mensais acumulados
-        monthly_profits = []
-        profit = 0
-        cost = model.investment_cost
-        for i in range(1, projection_months + 1):
-            if i <= model.development_months:
-                cost += model.monthly_operational_cost
-            elif i >= model.time_to_results_months:
-                profit += model.monthly_return_estimate - model.monthly_operational_cost
-            else:
-                cost += model.monthly_operational_cost
-            monthly_profits.append(profit - cost)
+@profiling.profiled
+def calculate_roi(
+    inputs: List[ROIInput],
+    request: Request,
+    projection_months: int = Query(60),
+    stream: bool = Query(False),
+    fields: Optional[str] = Query(None, description="Comma-separated result fields to return"),
+    series: Literal["monthly", "quarterly", "yearly", "none"] = Query("monthly"),
+    precision: Optional[int] = Query(None, ge=0, le=15)
+):
+    _observe_batch("/calculate", inputs, projection_months)
+    shape = _response_shape(fields, series, precision)
+    media_type = NDJSON_MEDIA_TYPE if _wants_ndjson(request, stream) else _response_media_type(request)
+    tag, not_modified = _conditional(
+        request,
+        "/calculate",
+        request_fingerprint(inputs, projection_months=projection_months, fields=shape.fields, series=series, precision=precision, media_type=media_type)
+    )
+    if not_modified is not None:
+        return not_modified
+    if media_type == NDJSON_MEDIA_TYPE:
+        return StreamingResponse(profiling.profiled_iter(_iter_ndjson(inputs, projection_months, shape)), media_type=NDJSON_MEDIA_TYPE, headers={"ETag": tag})
+    # Serialização própria: o jsonable_encoder percorreria cada float da série mensal
+    return Response(serialization.render(_results(inputs, projection_months, shape), media_type), media_type=media_type, headers={"ETag": tag})
 
-        results.append({
-            "name": getattr(scenario, "name", "unknown"),
-            "roi": roi_data["roi"],
-            "total_cost": roi_data["total_cost"],
-            "total_return": roi_data["total_return"],
-            "break_even_month": roi_data["break_even_month"],
-            "monthly_profits": monthly_profits
-        })
-    return results
 
+@app.websocket("/ws/calculate")
+async def live_calculate(websocket: WebSocket):
+    await live.serve(websocket, _results, config.LIVE_DEBOUNCE_MS / 1000, config.LIVE_MAX_SCENARIOS)
 
-@app.post("/export/pdf")
-def export_pdf(inputs: List[ROIInput], projection_months: int = Query(60)):
-    results = []
-    for scenario in inputs:
-        model = DataInitiativeROI(
-            investment_cost=scenario.investment_cost,
-            monthly_operational_cost=scenario.monthly_operational_cost,
-            num_people=scenario.num_people,
-            development_months=scenario.development_months,
-            monthly_return_estimate=scenario.monthly_return_estimate,
-            time_to_results_months=scenario.time_to_results_months,
-            technologies=scenario.technologies
-        )
-        roi_data = model.estimate_roi(projection_months)
-        scenario_result = {
-            "name": getattr(scenario, "name", "Unknown"),
-            "roi": roi_data["roi"],
-            "break_even": roi_data["break_even_month"],
-            "total_cost": roi_data["total_cost"],
-            "total_return": roi_data["total_return"],
-            "risk_level": _calculate_risk_level(roi_data["roi"]),
-            "technologies": scenario.technologies,
-            "num_people": scenario.num_people,
-            "development_months": scenario.development_months,
-            "time_to_results": scenario.time_to_results_months
-        }
-        results.append(scenario_result)
-
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4), leftMargin=20, rightMargin=20)
-    styles = getSampleStyleSheet()
-    elements = []
-
-    title = Paragraph("<b>Open Data ROI Report</b>", styles['Title'])
-    date = Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M')}", styles['Normal'])
-    subtitle = Paragraph("This report provides an overview of different data initiative scenarios and their estimated ROI, payback period, and viability.", styles['Normal'])
-    elements.extend([title, date, subtitle, Spacer(1, 12)])
-
-    table_data = [["Scenario", "ROI (%)", "Break-even (months)", "Total Cost (R$)", "Total Return (R$)", "Viability"]]
-    for result in results:
-        break_even_display = result["break_even"] if result["break_even"] >= 0 else "🔴 Not viable"
-        table_data.append([
-            result["name"],
-            f"{result['roi'] * 100:.2f}%",
+
+@profiling.profiled
+def _calculate_columnar(request: Request, body: bytes, projection_months: int, media_type: str, shape: ResponseShape) -> Response:
+    try:
+        payload = json.loads(body)
+    except ValueError as error:
+        raise RequestValidationError([{"loc": ["body"], "msg": f"JSON decode error: {error}", "type": "json_invalid"}])
+    names, columns, errors = parse_columnar_input(payload)
+    if errors:
+        raise RequestValidationError(errors)
+
+    _observe_batch("/calculate/columnar", names, projection_months)
+    tag, not_modified = _conditional(
+        request,
+        "/calculate/columnar",
+        columns_fingerprint(names, columns, projection_months=projection_months, fields=shape.fields, series=shape.series, precision=shape.precision, media_type=media_type)
+    )
+    if not_modified is not None:
+        return not_modified
+    # Direto para o ScenarioBatch: sem um ROIInput por cenário e sem o cache por cenário
+    batch = ScenarioBatch(**{field: columns[field] for field in SCENARIO_FIELDS})
+    roi_data = batch.estimate_roi(projection_months, include_break_even=shape.needs_break_even)
+    series = batch.cumulative_profits(projection_months) if shape.needs_series else None
+    return Response(serialization.render(shape.rows(names, roi_data, series), media_type), media_type=media_type, headers={"ETag": tag})
+
+
+@app.post("/calculate/columnar")
+async def calculate_roi_columnar(
+    request: Request,
+    projection_months: int = Query(60),
+    fields: Optional[str] = Query(None, description="Comma-separated result fields to return"),
+    series: Literal["monthly", "quarterly", "yearly", "none"] = Query("monthly"),
+    precision: Optional[int] = Query(None, ge=0, le=15)
+):
+    # Corpo lido cru: a validação do formato colunar é feita em bloco, sem o Pydantic por objeto
+    media_type = _response_media_type(request)
+    shape = _response_shape(fields, series, precision)
+    body = await request.body()
+    return await run_in_threadpool(_calculate_columnar, request, body, projection_months, media_type, shape)
+
+
+@profiling.profiled
+def _pdf_rows(inputs: List[ROIInput], projection_months: int) -> List[list]:
+    rows = []
+    for scenario, projection in zip(inputs, _project(inputs, projection_months)):
+        break_even_display = projection.break_even_month if projection.break_even_month >= 0 else "🔴 Not viable"
+        rows.append([
+            getattr(scenario, "name", "Unknown"),
+            f"{projection.roi * 100:.2f}%",
             break_even_display,
-            f"{result['total_cost']:.2f}",
-            f"{result['total_return']:.2f}",
-            result["risk_level"]
+            f"{projection.total_cost:.2f}",
+            f"{projection.total_return:.2f}",
+            _calculate_risk_level(projection.roi)
         ])
+    return rows
+
+
+@app.post("/export/pdf")
+async def export_pdf(inputs: List[ROIInput], request: Request, projection_months: int = Query(60)):
+    _observe_batch("/export/pdf", inputs, projection_months)
+    # A data de geração impressa no PDF é a do primeiro download; revalidações devolvem 304.
+    # ETag fraca: dois downloads do mesmo pedido são equivalentes, mas não idênticos byte a byte
+    fingerprint = await run_in_threadpool(request_fingerprint, inputs, projection_months=projection_months)
+    tag, not_modified = _conditional(request, "/export/pdf", fingerprint, weak=True)
+    if not_modified is not None:
+        return not_modified
+    rows = await run_in_threadpool(_pdf_rows, inputs, projection_months)
+    generated_on = datetime.now().strftime('%Y-%m-%d %H:%M')
+
+    # Renderização fora do worker HTTP e com limite de concorrência, para não atrasar o /calculate
+    async with pdf_render_slots:
+        metrics.PDF_RENDERS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            # Com profiling ativo a renderização fica no processo, onde o profiler consegue vê-la
+            pool = None if profiling.active() else pools.pdf_pool()
+            if pool is None:
+                pdf = await run_in_threadpool(profiling.profiled(pools.render_pdf), rows, generated_on)
+            else:
+                pdf = await asyncio.get_running_loop().run_in_executor(pool, pools.render_pdf, rows, generated_on)
+        finally:
+            metrics.PDF_RENDERS_IN_FLIGHT.dec()
+        metrics.PDF_RENDER_DURATION.observe(time.perf_counter() - started)
 
-    col_widths = [100, 80, 120, 120, 130, 180]
-    table = Table(table_data, hAlign='LEFT', colWidths=col_widths)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#254d32')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#e6f2e6')),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-    ]))
+    return Response(pdf, media_type="application/pdf", headers={"Content-Disposition": "attachment; filename=roi_report.pdf", "ETag": tag})
 
-    elements.append(table)
-    footer = Paragraph("This report was generated using <b>Open Data ROI</b>.", styles['Italic'])
-    elements.extend([Spacer(1, 24), footer])
-    doc.build(elements)
-    buffer.seek(0)
 
-    return StreamingResponse(buffer, media_type="application/pdf", headers={"Content-Disposition": "attachment; filename=roi_report.pdf"})
+RISK_LEVELS = [
+    "🔴 High Risk (Not viable)",
+    "🟡 Medium Risk (Moderate viability)",
+    "🟢 Low Risk (Viable)"
+]
 
 
 def _calculate_risk_level(roi: float) -> str:
     if roi < 0:
-        return "🔴 High Risk (Not viable)"
+        return RISK_LEVELS[0]
     elif roi < 1:
-        return "🟡 Medium Risk (Moderate viability)"
+        return RISK_LEVELS[1]
     else:
-        return "🟢 Low Risk (Viable)"
+        return RISK_LEVELS[2]
+
+def _iter_csv(inputs: List[ROIInput], projection_months: int, progress: Optional[Callable[[float], None]] = None):
+    import csv_report
+    for block in csv_report.iter_csv(_iter_projections(inputs, projection_months), len(inputs), config.CSV_STREAM_CHUNK_BYTES, progress):
+        metrics.CSV_BYTES_STREAMED.inc(len(block))
+        yield block
+
 
 @app.post("/export/csv")
-def export_csv(inputs: List[ROIInput], projection_months: int = Query(60)):
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["Scenario", "Month", "Profit"])
-
-    for scenario in inputs:
-        model = DataInitiativeROI(
-            investment_cost=scenario.investment_cost,
-            monthly_operational_cost=scenario.monthly_operational_cost,
-            num_people=scenario.num_people,
-            development_months=scenario.development_months,
-            monthly_return_estimate=scenario.monthly_return_estimate,
-            time_to_results_months=scenario.time_to_results_months,
-            technologies=scenario.technologies
+@profiling.profiled
+def export_csv(inputs: List[ROIInput], request: Request, projection_months: int = Query(60)):
+    _observe_batch("/export/csv", inputs, projection_months)
+    tag, not_modified = _conditional(request, "/export/csv", request_fingerprint(inputs, projection_months=projection_months))
+    if not_modified is not None:
+        return not_modified
+    return StreamingResponse(
+        profiling.profiled_iter(_iter_csv(inputs, projection_months)),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=roi_data.csv", "ETag": tag}
+    )
+
+
+@app.post("/export/columnar")
+@profiling.profiled
+def export_columnar(
+    inputs: List[ROIInput],
+    request: Request,
+    # A série vira uma lista de tamanho fixo no Arrow, que não admite tamanho zero
+    projection_months: int = Query(60, ge=1),
+    format: Literal["arrow", "parquet"] = Query("arrow")
+):
+    try:
+        import columnar
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Columnar export requires pyarrow to be installed")
+
+    _observe_batch("/export/columnar", inputs, projection_months)
+    tag, not_modified = _conditional(request, "/export/columnar", request_fingerprint(inputs, projection_months=projection_months, format=format))
+    if not_modified is not None:
+        return not_modified
+    batch = ScenarioBatch.from_scenarios(inputs)
+    roi_data = batch.estimate_roi(projection_months)
+    risk_index = np.select([roi_data["roi"] < 0, roi_data["roi"] < 1], [0, 1], 2)
+    table = columnar.build_table(
+        [getattr(scenario, "name", "unknown") for scenario in inputs],
+        roi_data,
+        batch.cumulative_profits(projection_months),
+        risk_index,
+        RISK_LEVELS
+    )
+    return Response(
+        columnar.serialize(table, format),
+        media_type=columnar.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=roi_data.{columnar.EXTENSIONS[format]}", "ETag": tag}
+    )
+
+
+def _csv_export_task(inputs: List[ROIInput], projection_months: int):
+    def task(output, progress):
+        for block in _iter_csv(inputs, projection_months, progress):
+            output.write(block)
+    return task
+
+
+def _pdf_export_task(inputs: List[ROIInput], projection_months: int):
+    def task(output, progress):
+        rows = _pdf_rows(inputs, projection_months)
+        progress(0.5)
+        generated_on = datetime.now().strftime('%Y-%m-%d %H:%M')
+        started = time.perf_counter()
+        pool = pools.pdf_pool()
+        if pool is None:
+            pdf = pools.render_pdf(rows, generated_on)
+        else:
+            pdf = pool.submit(pools.render_pdf, rows, generated_on).result()
+        metrics.PDF_RENDER_DURATION.observe(time.perf_counter() - started)
+        output.write(pdf)
+    return task
+
+
+EXPORT_JOBS = {
+    "csv": ("csv", "text/csv", "roi_data.csv", _csv_export_task),
+    "pdf": ("pdf", "application/pdf", "roi_report.pdf", _pdf_export_task)
+}
+
+
+def _job_status(job: dict) -> dict:
+    status = {key: job[key] for key in ("id", "kind", "status", "progress", "created_at", "updated_at", "expires_at", "size_bytes", "error")}
+    status["result_url"] = f"/jobs/{job['id']}/result" if job["status"] == "done" else None
+    return status
+
+
+@app.post("/jobs/export/{kind}", status_code=202)
+def submit_export_job(
+    kind: Literal["csv", "pdf"],
+    inputs: List[ROIInput],
+    projection_months: int = Query(60),
+    idempotency_key: Optional[str] = Header(None)
+):
+    extension, media_type, _, build_task = EXPORT_JOBS[kind]
+    _observe_batch(f"/jobs/export/{kind}", inputs, projection_months)
+    try:
+        job, created = export_jobs.submit(
+            kind,
+            extension,
+            media_type,
+            build_task(inputs, projection_months),
+            request_fingerprint(inputs, kind=kind, projection_months=projection_months),
+            idempotency_key
         )
-        csv_data = model.export_to_csv(projection_months)
-        reader = csv.reader(io.StringIO(csv_data))
-        next(reader)  # Skip header
-        for row in reader:
-            writer.writerow([getattr(scenario, "name", "unknown")] + row)
-
-    output.seek(0)
-    return StreamingResponse(io.BytesIO(output.getvalue().encode()), media_type="text/csv", headers={"Content-Disposition": "attachment; filename=roi_data.csv"})
+    except IdempotencyConflict as error:
+        raise HTTPException(status_code=409, detail=str(error))
+    if created:
+        metrics.EXPORT_JOBS_SUBMITTED.inc(1.0, kind)
+    return JSONResponse(_job_status(job), status_code=202 if created else 200)
+
+
+@app.get("/jobs/{job_id}")
+def get_export_job(job_id: str):
+    job = export_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return _job_status(job)
+
+
+@app.get("/jobs/{job_id}/result")
+def download_export_job(job_id: str):
+    job = export_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return FileResponse(export_jobs.artifact_path(job), media_type=job["media_type"], filename=EXPORT_JOBS[job["kind"]][2])
+
+
+@app.post("/simulate")
+@profiling.profiled
+def simulate(request: SimulationInput):
+    if request.draws > config.SIMULATION_MAX_DRAWS:
+        raise HTTPException(status_code=422, detail=f"draws must not exceed {config.SIMULATION_MAX_DRAWS}")
+
+    result = simulation.simulate(
+        request.model_dump(include=set(SCENARIO_FIELDS)),
+        request.projection_months,
+        request.draws,
+        seed=request.seed,
+        bins=request.bins,
+        parallel=request.parallel
+    )
+    return {"name": request.name, **result}
+
+
+@app.post("/sweep")
+@profiling.profiled
+def sweep_parameters(request: SweepInput):
+    try:
+        return sweep.sweep(
+            request.base.model_dump(include=set(SCENARIO_FIELDS)),
+            {field: spec.model_dump() for field, spec in request.ranges.items()},
+            request.projection_months,
+            include_surfaces=request.include_surfaces,
+            chunk_size=request.chunk_size
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=422, detail=str(error))
+
+
+@app.post("/solve")
+@profiling.profiled
+def solve(request: SolveInput):
+    target_value = request.target_value
+    if isinstance(target_value, list) and len(target_value) != len(request.scenarios):
+        raise HTTPException(status_code=422, detail="target_value must be a number or have one value per scenario")
+    return solver.goal_seek(request.scenarios, request.solve_for, request.target, target_value, request.projection_months)
+
+
+@app.post("/portfolio/optimize")
+@profiling.profiled
+def optimize_portfolio(request: PortfolioInput):
+    return portfolio.optimize(
+        request.candidates,
+        request.cost_cap,
+        request.outlay_cap,
+        request.objective,
+        request.annual_discount_rate,
+        request.projection_months,
+        request.mode,
+        request.epsilon
+    )
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return result_cache.stats()
+
+
+@app.get("/metrics")
+def metrics_endpoint():
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/profiles/{report_id}")
+def get_profile_report(report_id: str, request: Request):
+    if not profiling.authorized(request.scope):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+    report = profiling.load_report(report_id, config.PROFILING_DIR) if config.PROFILING_ENABLED else None
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile report not found")
+    return report
+
+
+_WARM_UP_SCENARIO = ROIInput(
+    name="warm-up",
+    investment_cost=150000,
+    monthly_operational_cost=35000,
+    num_people=4,
+    development_months=6,
+    monthly_return_estimate=50000,
+    time_to_results_months=7
+)
+
+
+def _warm_result_cache() -> str:
+    # Primeira passada pelo cálculo, série e serialização; o resultado fica no cache
+    serialization.dumps_json(_results([_WARM_UP_SCENARIO], 60, ResponseShape()))
+    return f"{len(result_cache)} cached projections"
+
+
+def _warm_process_pool() -> str:
+    if not pools.parallel_enabled():
+        return "disabled (single worker)"
+    return f"{pools.prestart(pools.process_pool(), config.PROCESS_POOL_WORKERS)} workers started"
+
+
+def _warm_pdf_renderer() -> str:
+    pool = pools.pdf_pool()
+    if pool is None:
+        import pdf_report
+        pdf_report.warm_up()
+        return "in-process renderer ready"
+    return f"{pools.prestart(pool, config.PDF_RENDER_WORKERS)} workers started"
+
+
+def _warm_export_jobs() -> str:
+    os.makedirs(export_jobs.directory, exist_ok=True)
+    if not os.access(export_jobs.directory, os.W_OK):
+        raise OSError(f"{export_jobs.directory} is not writable")
+    return export_jobs.directory
+
+
+def warm_up() -> None:
+    steps = {
+        "result_cache": _warm_result_cache,
+        "process_pool": _warm_process_pool,
+        "pdf_renderer": _warm_pdf_renderer,
+        "export_jobs": _warm_export_jobs
+    }
+    for check, step in steps.items():
+        try:
+            readiness.mark(check, True, step())
+        except Exception as error:
+            readiness.mark(check, False, f"{type(error).__name__}: {error}")
+
+
+@app.get("/healthz")
+async def healthz():
+    # Vivo = o event loop responde; não depende de pools nem de cálculo
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    report = readiness.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
@@ -0,0 +1,195 @@
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Exposição no formato texto do Prometheus (0.0.4), sem dependências externas
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for v in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], Tuple[str, ...], float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, names, values, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, *labelvalues: str) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [("", self.labelnames, key, value) for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, *labelvalues: str) -> None:
+        self.inc(-amount, *labelvalues)
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            self._values[labelvalues] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                # contagem por faixa (não acumulada), seguida da soma
+                state = self._values[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            snapshot = {key: list(state) for key, state in self._values.items()}
+        for key, state in snapshot.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), state[:-1]):
+                cumulative += count
+                samples.append(("_bucket", self.labelnames + ("le",), key + (_format_value(float(bound)),), cumulative))
+            samples.append(("_sum", self.labelnames, key, state[-1]))
+            samples.append(("_count", self.labelnames, key, cumulative))
+        return samples
+
+
+class CallbackMetric(_Metric):
+    # Valor lido na hora da coleta (estatísticas de caches e pools que já mantêm seus contadores)
+    def __init__(self, name: str, documentation: str, kind: str, callback: Callable[[], float]):
+        super().__init__(name, documentation)
+        self.kind = kind
+        self._callback = callback
+
+    def samples(self):
+        return [("", (), (), self._callback())]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS, labelnames: Sequence[str] = ()) -> Histogram:
+        return self.register(Histogram(name, documentation, buckets, labelnames))
+
+    def callback(self, name: str, documentation: str, kind: str, callback: Callable[[], float]) -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, kind, callback))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_DURATION = REGISTRY.histogram(
+    "roi_http_request_duration_seconds", "HTTP request latency by route.", labelnames=("route", "method", "status")
+)
+REQUESTS_IN_FLIGHT = REGISTRY.gauge("roi_http_requests_in_flight", "HTTP requests currently being served.")
+SCENARIOS_PER_REQUEST = REGISTRY.histogram(
+    "roi_scenarios_per_request", "Scenarios received per request.",
+    buckets=(1, 3, 10, 30, 100, 300, 1000, 3000, 10000, 30000, 100000), labelnames=("route",)
+)
+MONTHS_PER_REQUEST = REGISTRY.histogram(
+    "roi_projection_months_per_request", "Projection horizon requested, in months.",
+    buckets=(12, 24, 36, 60, 120, 240, 600, 1200), labelnames=("route",)
+)
+PDF_RENDER_DURATION = REGISTRY.histogram("roi_pdf_render_duration_seconds", "Time spent rendering PDF reports.")
+PDF_RENDERS_IN_FLIGHT = REGISTRY.gauge("roi_pdf_renders_in_flight", "PDF renders holding a render slot.")
+CSV_BYTES_STREAMED = REGISTRY.counter("roi_csv_bytes_streamed_total", "Bytes of CSV produced by exports.")
+EXPORT_JOBS_SUBMITTED = REGISTRY.counter("roi_export_jobs_submitted_total", "Export jobs created.", labelnames=("kind",))
+LIVE_SESSIONS = REGISTRY.gauge("roi_live_sessions", "Open live recomputation WebSockets.")
+LIVE_UPDATE_DURATION = REGISTRY.histogram("roi_live_update_duration_seconds", "Compute time per coalesced live update.")
+
+
+class MetricsMiddleware:
+    # Middleware ASGI puro: só um relógio, um gauge e um histograma por requisição
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                getattr(route, "path", "unmatched"),
+                scope["method"],
+                str(status)
+            )
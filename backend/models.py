@@ -1,5 +1,7 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field, model_validator
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
+import numpy as np
+from estimator import INTEGER_SCENARIO_FIELDS, SCENARIO_FIELDS
 
 class ROIInput(BaseModel):
     name: str
@@ -9,4 +11,163 @@ class ROIInput(BaseModel):
     development_months: int
     monthly_return_estimate: float
     time_to_results_months: int
-    technologies: List[str] = []
\ No newline at end of file
+    technologies: List[str] = []
+
+
+class Distribution(BaseModel):
+    # Para lognormal, mean/std são da normal subjacente (mesma parametrização do NumPy)
+    kind: Literal["triangular", "normal", "uniform", "lognormal"]
+    low: Optional[float] = None
+    mode: Optional[float] = None
+    high: Optional[float] = None
+    mean: Optional[float] = None
+    std: Optional[float] = None
+
+    @model_validator(mode="after")
+    def check_parameters(self) -> "Distribution":
+        required = {
+            "triangular": ("low", "mode", "high"),
+            "normal": ("mean", "std"),
+            "uniform": ("low", "high"),
+            "lognormal": ("mean", "std")
+        }[self.kind]
+        missing = [name for name in required if getattr(self, name) is None]
+        if missing:
+            raise ValueError(f"{self.kind} distribution requires: {', '.join(missing)}")
+        if self.kind in ("triangular", "uniform") and self.low > self.high:
+            raise ValueError("low must not be greater than high")
+        if self.kind == "triangular" and not self.low <= self.mode <= self.high:
+            raise ValueError("mode must be between low and high")
+        if self.std is not None and self.std < 0:
+            raise ValueError("std must not be negative")
+        return self
+
+
+class SimulationInput(BaseModel):
+    name: str = "simulation"
+    investment_cost: Union[float, Distribution]
+    monthly_operational_cost: Union[float, Distribution]
+    num_people: int = 1
+    development_months: Union[int, Distribution]
+    monthly_return_estimate: Union[float, Distribution]
+    time_to_results_months: Union[int, Distribution]
+    projection_months: int = 60
+    draws: int = Field(100000, ge=1)
+    seed: Optional[int] = None
+    bins: int = Field(50, ge=1, le=1000)
+    parallel: Optional[bool] = None
+
+
+class SweepRange(BaseModel):
+    values: Optional[List[float]] = None
+    start: Optional[float] = None
+    stop: Optional[float] = None
+    steps: Optional[int] = Field(None, ge=1)
+
+    @model_validator(mode="after")
+    def check_range(self) -> "SweepRange":
+        if self.values is None and None in (self.start, self.stop, self.steps):
+            raise ValueError("provide either values or start, stop and steps")
+        if self.values is not None and not self.values:
+            raise ValueError("values must not be empty")
+        return self
+
+
+class SweepInput(BaseModel):
+    base: ROIInput
+    ranges: Dict[str, SweepRange]
+    projection_months: int = 60
+    include_surfaces: bool = True
+    chunk_size: Optional[int] = Field(None, ge=1)
+
+
+class SolveInput(BaseModel):
+    scenarios: List[ROIInput]
+    solve_for: Literal[
+        "investment_cost",
+        "monthly_operational_cost",
+        "development_months",
+        "monthly_return_estimate",
+        "time_to_results_months"
+    ]
+    target: Literal["roi", "break_even_month"]
+    target_value: Union[float, List[float]]
+    projection_months: int = 60
+
+
+class PortfolioInput(BaseModel):
+    candidates: List[ROIInput]
+    cost_cap: Optional[float] = Field(None, ge=0)
+    outlay_cap: Optional[float] = Field(None, ge=0)
+    objective: Literal["total_return", "npv"] = "total_return"
+    annual_discount_rate: float = Field(0.1, gt=-1)
+    projection_months: int = 60
+    mode: Literal["exact", "approximate"] = "exact"
+    epsilon: float = Field(0.01, gt=0, lt=1)
+
+    @model_validator(mode="after")
+    def check_caps(self) -> "PortfolioInput":
+        if self.cost_cap is None and self.outlay_cap is None:
+            raise ValueError("provide cost_cap and/or outlay_cap")
+        return self
+
+
+def _column_error(field: str, message: str, error_type: str) -> dict:
+    return {"loc": ["body", field], "msg": message, "type": error_type}
+
+
+def parse_columnar_input(payload: Any) -> Tuple[List[str], Dict[str, np.ndarray], List[dict]]:
+    # Formato colunar do /calculate: um array por campo, validado de uma vez em vez de objeto a objeto.
+    # Devolve (nomes, colunas, erros) com os erros no mesmo formato do FastAPI.
+    if not isinstance(payload, dict):
+        return [], {}, [{"loc": ["body"], "msg": "Input should be an object of equal-length arrays", "type": "dict_type"}]
+
+    errors = []
+    columns = {}
+    for field in SCENARIO_FIELDS + ("num_people",):
+        values = payload.get(field)
+        if values is None:
+            if field != "num_people":
+                errors.append(_column_error(field, "Field required", "missing"))
+            continue
+        if not isinstance(values, list):
+            errors.append(_column_error(field, "Input should be a valid list", "list_type"))
+            continue
+        try:
+            column = np.asarray(values)
+        except ValueError:
+            column = None
+        if column is None or column.ndim != 1 or (len(values) and column.dtype.kind not in "iuf"):
+            errors.append(_column_error(field, "Input should be an array of numbers", "float_type"))
+            continue
+        if column.dtype.kind == "f" and not np.isfinite(column).all():
+            errors.append(_column_error(field, "Input should be a finite number", "finite_number"))
+            continue
+        if field in INTEGER_SCENARIO_FIELDS or field == "num_people":
+            if column.dtype.kind == "f" and (column != np.trunc(column)).any():
+                errors.append(_column_error(field, "Input should be a valid integer, got a number with a fractional part", "int_from_float"))
+                continue
+            if column.dtype.kind == "u" or (len(column) and np.abs(column).max() >= 2 ** 63):
+                errors.append(_column_error(field, "Input should be an integer within the int64 range", "int_range"))
+                continue
+            column = column.astype(np.int64)
+        else:
+            column = column.astype(np.float64)
+        columns[field] = column
+
+    names = payload.get("name")
+    if names is not None and not (isinstance(names, list) and all(isinstance(name, str) for name in names)):
+        errors.append(_column_error("name", "Input should be an array of strings", "string_type"))
+        names = None
+
+    lengths = {field: len(column) for field, column in columns.items()}
+    if names is not None:
+        lengths["name"] = len(names)
+    if len(set(lengths.values())) > 1:
+        detail = ", ".join(f"{field}={length}" for field, length in lengths.items())
+        errors.append({"loc": ["body"], "msg": f"All columns must have the same length ({detail})", "type": "length_mismatch"})
+
+    if errors:
+        return [], {}, errors
+    count = len(columns[SCENARIO_FIELDS[0]])
+    return names if names is not None else ["unknown"] * count, columns, []
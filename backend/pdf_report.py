@@ -0,0 +1,62 @@
+import io
+from functools import lru_cache
+from typing import List
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+import config
+
+TABLE_HEADER = ["Scenario", "ROI (%)", "Break-even (months)", "Total Cost (R$)", "Total Return (R$)", "Viability"]
+COL_WIDTHS = [100, 80, 120, 120, 130, 180]
+
+
+@lru_cache(maxsize=1)
+def _styles():
+    return getSampleStyleSheet()
+
+
+@lru_cache(maxsize=1)
+def _table_style() -> TableStyle:
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#254d32')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#e6f2e6')),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ])
+
+
+def warm_up() -> None:
+    # Monta estilos e fontes uma vez no processo (usado ao iniciar os workers do pool)
+    _styles()
+    _table_style()
+
+
+def render(rows: List[list], generated_on: str) -> bytes:
+    styles = _styles()
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4), leftMargin=20, rightMargin=20)
+    elements = []
+
+    title = Paragraph("<b>Open Data ROI Report</b>", styles['Title'])
+    date = Paragraph(f"Generated on: {generated_on}", styles['Normal'])
+    subtitle = Paragraph("This report provides an overview of different data initiative scenarios and their estimated ROI, payback period, and viability.", styles['Normal'])
+    elements.extend([title, date, subtitle, Spacer(1, 12)])
+
+    # Tabelas do tamanho de uma página: o ReportLab não precisa dividir uma tabela gigante,
+    # então o tempo de renderização cresce linearmente com o número de cenários
+    rows_per_table = max(config.PDF_ROWS_PER_TABLE, 1)
+    for start in range(0, max(len(rows), 1), rows_per_table):
+        table = Table([TABLE_HEADER] + rows[start:start + rows_per_table], hAlign='LEFT', colWidths=COL_WIDTHS, repeatRows=1)
+        table.setStyle(_table_style())
+        elements.append(table)
+
+    footer = Paragraph("This report was generated using <b>Open Data ROI</b>.", styles['Italic'])
+    elements.extend([Spacer(1, 24), footer])
+    doc.build(elements)
+    return buffer.getvalue()
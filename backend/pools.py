@@ -0,0 +1,74 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+import config
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def process_pool() -> ProcessPoolExecutor:
+    # Criado sob demanda: a maioria dos workers nunca precisa dele
+    global _process_pool
+    with _lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=max(config.PROCESS_POOL_WORKERS, 1))
+        return _process_pool
+
+
+def _warm_pdf_worker() -> None:
+    # Roda no processo do pool: o ReportLab é carregado só ali, nunca no worker da API
+    import pdf_report
+    pdf_report.warm_up()
+
+
+def render_pdf(rows: list, generated_on: str) -> bytes:
+    # Tarefa enviada ao pool de PDF: o import acontece no processo que executa, então o worker
+    # da API só carrega o ReportLab quando renderiza ele mesmo (ROI_PDF_RENDER_WORKERS=0)
+    import pdf_report
+    return pdf_report.render(rows, generated_on)
+
+
+def pdf_pool() -> Optional[ProcessPoolExecutor]:
+    # Separado do pool de cálculo para que renderizações lentas não disputem com /simulate e /sweep.
+    # Com ROI_PDF_RENDER_WORKERS=0 o PDF é renderizado no threadpool do próprio processo.
+    global _pdf_pool
+    if config.PDF_RENDER_WORKERS <= 0:
+        return None
+    with _lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(max_workers=config.PDF_RENDER_WORKERS, initializer=_warm_pdf_worker)
+        return _pdf_pool
+
+
+def prestart(pool: ProcessPoolExecutor, workers: int, task: Callable = os.getpid) -> int:
+    # Sobe todos os processos do pool de uma vez (o executor só os cria conforme a demanda)
+    for future in [pool.submit(task) for _ in range(max(workers, 1))]:
+        future.result()
+    return len(pool._processes or {})
+
+
+def parallel_enabled() -> bool:
+    return config.PROCESS_POOL_WORKERS > 1
+
+
+def stats() -> dict:
+    # Workers ativos por pool (0 enquanto o pool não foi criado)
+    with _lock:
+        return {
+            "process": max(config.PROCESS_POOL_WORKERS, 1) if _process_pool is not None else 0,
+            "pdf": config.PDF_RENDER_WORKERS if _pdf_pool is not None else 0
+        }
+
+
+def shutdown() -> None:
+    global _process_pool, _pdf_pool
+    with _lock:
+        for pool in (_process_pool, _pdf_pool):
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        _process_pool = None
+        _pdf_pool = None
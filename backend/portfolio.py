@@ -0,0 +1,179 @@
+import time
+from bisect import bisect_right
+from typing import Dict, Optional
+
+import numpy as np
+
+import config
+from estimator import ScenarioBatch
+
+# Folga relativa no limite superior para absorver o arredondamento das somas acumuladas
+_BOUND_SLACK = 1e-9
+
+
+def candidate_metrics(scenarios, projection_months: int, annual_discount_rate: float) -> Dict[str, np.ndarray]:
+    batch = ScenarioBatch.from_scenarios(scenarios)
+    roi_data = batch.estimate_roi(projection_months)
+    cumulative = batch.cumulative_profits(projection_months)
+
+    # Fluxo de cada mês = variação do acumulado; o investimento sai no mês 0
+    investment = batch.investment_cost
+    flows = np.diff(cumulative, axis=1, prepend=-investment[:, None])
+    monthly_rate = (1 + annual_discount_rate) ** (1 / 12) - 1
+    discount = (1 + monthly_rate) ** -np.arange(1, cumulative.shape[1] + 1)
+    npv = -investment + flows @ discount
+
+    # Maior caixa negativo acumulado; somar os picos de cada iniciativa é conservador para o portfólio
+    trough = np.minimum(-investment, cumulative.min(axis=1, initial=np.inf))
+
+    return {
+        "total_cost": roi_data["total_cost"],
+        "total_return": roi_data["total_return"],
+        "npv": npv,
+        "cash_outlay": np.maximum(-trough, 0.0)
+    }
+
+
+def _lp_bound(values: np.ndarray, weights: np.ndarray, capacity: float) -> float:
+    # Relaxação linear de uma mochila com uma restrição (itens fracionários, maior densidade primeiro)
+    with np.errstate(divide="ignore"):
+        density = np.where(weights > 0, values / weights, np.inf)
+    ranking = np.argsort(-density, kind="stable")
+    filled = np.cumsum(weights[ranking])
+    whole = np.searchsorted(filled, capacity, side="right")
+    total = values[ranking[:whole]].sum()
+    if whole < len(ranking):
+        total += values[ranking[whole]] * (capacity - (filled[whole - 1] if whole else 0.0)) / weights[ranking[whole]]
+    return total
+
+
+def branch_and_bound(
+    values: np.ndarray,
+    weights: np.ndarray,
+    caps: np.ndarray,
+    epsilon: float = 0.0,
+    node_limit: int = 500000
+) -> Dict:
+    # Mochila com uma ou mais restrições. O limite superior é a relaxação linear de uma restrição
+    # substituta (combinação das restrições normalizadas pelo teto), com os pesos da combinação
+    # escolhidos para apertar o limite na raiz. Com epsilon > 0 poda tudo que não pode melhorar a
+    # solução em mais de um fator 1/(1 - epsilon), garantindo valor >= (1 - epsilon) * ótimo.
+    fits_alone = np.all(weights <= caps[:, None], axis=0)
+    candidates = np.flatnonzero((values > 0) & fits_alone)
+    scale = np.where(caps > 0, caps, 1.0)
+    normalized = weights[:, candidates] / scale[:, None]
+    available = (caps > 0).astype(np.float64)
+
+    if len(caps) == 2:
+        mixes = [np.array([share, 1 - share]) for share in np.linspace(0, 1, 21)]
+    else:
+        mixes = [np.full(len(caps), 1.0)]
+    multipliers = min(mixes, key=lambda mix: _lp_bound(values[candidates], mix @ normalized, mix @ available))
+    surrogate = multipliers @ normalized
+    capacity = float(multipliers @ available)
+
+    with np.errstate(divide="ignore"):
+        density = np.where(surrogate > 0, values[candidates] / surrogate, np.inf)
+    ranking = np.argsort(-density, kind="stable")
+    order = candidates[ranking]
+    surrogate = surrogate[ranking]
+
+    v = values[order].tolist()
+    s = surrogate.tolist()
+    w = [tuple(item) for item in weights[:, order].T.tolist()]
+    cap = tuple(caps.tolist())
+    count = len(v)
+    prefix_v = np.concatenate([[0.0], np.cumsum(v)]).tolist()
+    prefix_s = np.concatenate([[0.0], np.cumsum(s)]).tolist()
+
+    def bound(i: int, remaining: float, value: float) -> float:
+        limit = prefix_s[i] + remaining
+        j = bisect_right(prefix_s, limit, lo=i) - 1
+        total = value + prefix_v[j] - prefix_v[i]
+        if j < count and s[j] > 0:
+            total += v[j] * (limit - prefix_s[j]) / s[j]
+        return total * (1 + _BOUND_SLACK)
+
+    best_value, best_chosen = 0.0, 0
+    pruned_bound, open_bound = 0.0, 0.0
+    nodes, truncated = 0, False
+    stack = [(0, 0.0, (0.0,) * len(cap), 0.0, 0)]
+    while stack:
+        i, value, used, used_s, chosen = stack.pop()
+        if value > best_value:
+            best_value, best_chosen = value, chosen
+        if i == count:
+            continue
+
+        upper = bound(i, capacity - used_s, value)
+        if (1 - epsilon) * upper <= best_value:
+            pruned_bound = max(pruned_bound, upper)
+            continue
+        if nodes >= node_limit:
+            truncated = True
+            open_bound = max(open_bound, upper)
+            continue
+        nodes += 1
+
+        # Empilha "sem o item" antes, para mergulhar primeiro incluindo os itens mais densos
+        stack.append((i + 1, value, used, used_s, chosen))
+        included = tuple(u + x for u, x in zip(used, w[i]))
+        if all(u <= c for u, c in zip(included, cap)):
+            stack.append((i + 1, value + v[i], included, used_s + s[i], chosen | (1 << i)))
+
+    selected = sorted(int(order[i]) for i in range(count) if best_chosen >> i & 1)
+    return {
+        "selected": selected,
+        "value": best_value,
+        "upper_bound": max(best_value, pruned_bound, open_bound),
+        "nodes": nodes,
+        "complete": not truncated
+    }
+
+
+def optimize(
+    scenarios,
+    cost_cap: Optional[float],
+    outlay_cap: Optional[float],
+    objective: str,
+    annual_discount_rate: float,
+    projection_months: int,
+    mode: str,
+    epsilon: float,
+    node_limit: Optional[int] = None
+) -> Dict:
+    started = time.perf_counter()
+    metrics = candidate_metrics(scenarios, projection_months, annual_discount_rate)
+
+    weights, caps = [], []
+    if cost_cap is not None:
+        weights.append(np.maximum(metrics["total_cost"], 0.0))
+        caps.append(cost_cap)
+    if outlay_cap is not None:
+        weights.append(metrics["cash_outlay"])
+        caps.append(outlay_cap)
+
+    tolerance = epsilon if mode == "approximate" else 0.0
+    result = branch_and_bound(
+        metrics[objective],
+        np.array(weights).reshape(len(caps), len(scenarios)),
+        np.array(caps, dtype=np.float64),
+        tolerance,
+        node_limit or config.PORTFOLIO_NODE_LIMIT
+    )
+
+    selected = result["selected"]
+    upper_bound = result["upper_bound"]
+    return {
+        "objective": objective,
+        "mode": mode,
+        "error_bound": tolerance,
+        "selected": [{"index": i, "name": getattr(scenarios[i], "name", "unknown")} for i in selected],
+        "objective_value": result["value"],
+        "upper_bound": upper_bound,
+        "optimality_gap": (upper_bound - result["value"]) / upper_bound if upper_bound > 0 else 0.0,
+        "complete": result["complete"],
+        "totals": {name: float(values[selected].sum()) for name, values in metrics.items()},
+        "nodes": result["nodes"],
+        "solve_time_ms": (time.perf_counter() - started) * 1000
+    }
@@ -0,0 +1,207 @@
+import contextvars
+import cProfile
+import functools
+import itertools
+import json
+import os
+import pstats
+import re
+import secrets
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import parse_qs
+
+import config
+
+PROFILE_HEADER = "x-profile"
+REPORTS_PATH = "/profiles/"
+REPORT_HEADER = b"x-profile-id"
+_REPORT_ID = re.compile(r"^[0-9a-f]{32}$")
+
+_session: contextvars.ContextVar[Optional["ProfileSession"]] = contextvars.ContextVar("profile_session", default=None)
+_request_counter = itertools.count(1)
+_rotate_lock = threading.Lock()
+
+
+class ProfileSession:
+    # Um cProfile.Profile por trecho perfilado: o profiler só enxerga a thread que o ativou,
+    # e os trechos de uma requisição rodam em threads do threadpool
+    def __init__(self, trigger: str):
+        self.id = uuid.uuid4().hex
+        self.trigger = trigger
+        self.profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def new_profile(self) -> cProfile.Profile:
+        profile = cProfile.Profile()
+        with self._lock:
+            self.profiles.append(profile)
+        return profile
+
+
+def active() -> bool:
+    return _session.get() is not None
+
+
+def profiled(function: Callable) -> Callable:
+    # Sem sessão ativa o custo é uma leitura de ContextVar
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        session = _session.get()
+        if session is None:
+            return function(*args, **kwargs)
+        return session.new_profile().runcall(function, *args, **kwargs)
+    return wrapper
+
+
+def profiled_iter(iterable: Iterable) -> Iterable:
+    # Respostas em streaming fazem o trabalho durante a iteração, depois que o handler retornou
+    session = _session.get()
+    if session is None:
+        yield from iterable
+        return
+    profile = session.new_profile()
+    iterator = iter(iterable)
+    while True:
+        profile.enable()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            profile.disable()
+        yield item
+
+
+def _requested(scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER.encode():
+            return value.decode("latin-1")
+    values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("profile")
+    return values[0] if values else None
+
+
+def _switch_on(value: Optional[str]) -> bool:
+    if value is None:
+        return False
+    if config.PROFILING_TOKEN:
+        return secrets.compare_digest(value.encode(), config.PROFILING_TOKEN.encode())
+    return value.lower() in ("1", "true", "yes")
+
+
+def authorized(scope) -> bool:
+    # Com token configurado, ler um relatório exige o mesmo token que disparou o profiling
+    if not config.PROFILING_TOKEN:
+        return True
+    return _switch_on(_requested(scope))
+
+
+def _trigger(scope) -> Optional[str]:
+    # Ler um relatório (com o token no mesmo header) não gera outro relatório
+    if not config.PROFILING_ENABLED or scope.get("path", "").startswith(REPORTS_PATH):
+        return None
+    if _switch_on(_requested(scope)):
+        return "request"
+    if config.PROFILING_SAMPLE_EVERY > 0 and next(_request_counter) % config.PROFILING_SAMPLE_EVERY == 0:
+        return "sample"
+    return None
+
+
+def build_report(session: ProfileSession, route: str, method: str, wall_seconds: float, top: int) -> Dict:
+    functions = []
+    profiled_seconds = 0.0
+    profiles = [profile for profile in session.profiles if profile.getstats()]
+    if profiles:
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        profiled_seconds = stats.total_tt
+        # Ordenado pelo tempo próprio: o que de fato consome CPU, não quem só delega
+        ranked = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+        for (filename, line, name), (primitive_calls, calls, own_time, cumulative_time, _) in ranked[:top]:
+            functions.append({
+                "function": name,
+                "file": filename,
+                "line": line,
+                "calls": calls,
+                "primitive_calls": primitive_calls,
+                "own_seconds": own_time,
+                "cumulative_seconds": cumulative_time,
+                "own_share": own_time / profiled_seconds if profiled_seconds else 0.0
+            })
+    return {
+        "id": session.id,
+        "trigger": session.trigger,
+        "route": route,
+        "method": method,
+        "created_at": time.time(),
+        "wall_seconds": wall_seconds,
+        "profiled_seconds": profiled_seconds,
+        "functions": functions
+    }
+
+
+def store_report(report: Dict, directory: str, max_reports: int) -> None:
+    os.makedirs(directory, exist_ok=True)
+    temporary = os.path.join(directory, f"{report['id']}.json.tmp")
+    with open(temporary, "w") as output:
+        json.dump(report, output)
+    os.replace(temporary, os.path.join(directory, f"{report['id']}.json"))
+
+    # Diretório rotativo: mantém só os relatórios mais recentes
+    with _rotate_lock:
+        reports = [entry for entry in os.scandir(directory) if entry.name.endswith(".json")]
+        reports.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in reports[:max(len(reports) - max_reports, 0)]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+def load_report(report_id: str, directory: str) -> Optional[Dict]:
+    if not _REPORT_ID.match(report_id):
+        return None
+    try:
+        with open(os.path.join(directory, f"{report_id}.json")) as source:
+            return json.load(source)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+class ProfilingMiddleware:
+    # O id do relatório vai no header da resposta; o relatório é gravado quando a resposta
+    # termina, então também cobre o trabalho feito durante o streaming
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        trigger = _trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        session = ProfileSession(trigger)
+
+        async def send_with_report_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(REPORT_HEADER, session.id.encode())]
+            await send(message)
+
+        token = _session.set(session)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_report_id)
+        finally:
+            _session.reset(token)
+            route = scope.get("route")
+            report = build_report(
+                session,
+                getattr(route, "path", scope["path"]),
+                scope["method"],
+                time.perf_counter() - started,
+                config.PROFILING_TOP_FUNCTIONS
+            )
+            store_report(report, config.PROFILING_DIR, config.PROFILING_MAX_REPORTS)
@@ -0,0 +1,55 @@
+import json
+from typing import Any, Optional
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # o caminho padrão continua funcionando, só mais lento
+    orjson = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+def _to_builtin(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def dumps_json(content: Any) -> bytes:
+    # orjson escreve os arrays float64 direto do buffer, sem criar um float Python por mês
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY, default=_to_builtin)
+    return json.dumps(content, default=_to_builtin, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def dumps_msgpack(content: Any) -> bytes:
+    import msgpack
+    return msgpack.packb(content, default=_to_builtin, use_bin_type=True)
+
+
+def negotiate(accept: Optional[str]) -> str:
+    # MessagePack só quando pedido explicitamente; qualquer outro Accept recebe JSON
+    accept = (accept or "").lower()
+    for media_type in MSGPACK_MEDIA_TYPES:
+        if media_type in accept:
+            return media_type
+    return JSON_MEDIA_TYPE
+
+
+def msgpack_available() -> bool:
+    try:
+        import msgpack  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def render(content: Any, media_type: str) -> bytes:
+    if media_type in MSGPACK_MEDIA_TYPES:
+        return dumps_msgpack(content)
+    return dumps_json(content)
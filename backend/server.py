@@ -0,0 +1,65 @@
+# Entrada de produção: uvicorn com vários workers, uvloop/httptools, reciclagem e desligamento gracioso.
+# Uso: python backend/server.py (configuração pelas variáveis ROI_SERVER_* em config.py)
+import importlib.util
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+import config
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def options() -> dict:
+    return {
+        "app": "main:app",
+        "host": config.SERVER_HOST,
+        "port": config.SERVER_PORT,
+        "workers": max(config.SERVER_WORKERS, 1),
+        "loop": "uvloop" if _available("uvloop") else "asyncio",
+        "http": "httptools" if _available("httptools") else "h11",
+        # Reciclagem: o supervisor sobe um worker novo quando um atinge o limite (0 = nunca)
+        "limit_max_requests": config.SERVER_MAX_REQUESTS or None,
+        "timeout_graceful_shutdown": config.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        "timeout_keep_alive": config.SERVER_KEEP_ALIVE_SECONDS,
+        "proxy_headers": True,
+        "forwarded_allow_ips": config.SERVER_FORWARDED_ALLOW_IPS,
+        "access_log": config.SERVER_ACCESS_LOG,
+    }
+
+
+def split_process_pool(workers: int) -> int:
+    # Divide os núcleos entre os workers para o pool de cálculo de cada um não disputar CPU.
+    # O config já foi importado aqui: ajusta o valor carregado (processo atual) e a variável
+    # de ambiente (workers novos), a não ser que o operador tenha fixado o tamanho
+    if "ROI_PROCESS_POOL_WORKERS" not in os.environ:
+        config.PROCESS_POOL_WORKERS = max((os.cpu_count() or 1) // max(workers, 1), 1)
+        os.environ["ROI_PROCESS_POOL_WORKERS"] = str(config.PROCESS_POOL_WORKERS)
+    return config.PROCESS_POOL_WORKERS
+
+
+def main() -> None:
+    settings = options()
+    workers = settings["workers"]
+    split_process_pool(workers)
+
+    server_config = uvicorn.Config(**settings)
+    server = uvicorn.Server(server_config)
+    if workers > 1 or settings["limit_max_requests"]:
+        # Mesmo com um worker, o supervisor é quem repõe o processo reciclado
+        sock = server_config.bind_socket()
+        Multiprocess(server_config, target=server.run, sockets=[sock]).run()
+    else:
+        server.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from estimator import payback, roi_over_time
+
+# Campos do resultado do /calculate, na ordem em que aparecem na resposta.
+# As séries prontas para gráfico (roi_over_time, payback) só vêm quando pedidas em fields.
+RESULT_FIELDS = ("name", "roi", "total_cost", "total_return", "break_even_month", "monthly_profits", "roi_over_time", "payback")
+DEFAULT_FIELDS = RESULT_FIELDS[:6]
+SERIES_FIELDS = ("monthly_profits", "roi_over_time", "payback")
+FLOAT_FIELDS = ("roi", "total_cost", "total_return")
+SERIES_STEPS = {"monthly": 1, "quarterly": 3, "yearly": 12}
+
+
+class ResponseShape:
+    # O que o cliente pediu: quais campos, em que resolução a série mensal e com quantas casas
+    def __init__(self, fields: Optional[Sequence[str]] = None, series: str = "monthly", precision: Optional[int] = None):
+        wanted = set(DEFAULT_FIELDS if fields is None else fields)
+        unknown = wanted - set(RESULT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. Choose from: {', '.join(RESULT_FIELDS)}")
+        if series != "none" and series not in SERIES_STEPS:
+            raise ValueError(f"Unknown series resolution: {series}")
+        if series == "none":
+            wanted.difference_update(SERIES_FIELDS)
+        if not wanted:
+            raise ValueError("Select at least one field")
+        self.fields = tuple(field for field in RESULT_FIELDS if field in wanted)
+        self.series = series
+        self.precision = precision
+
+    @classmethod
+    def from_query(cls, fields: Optional[str], series: str, precision: Optional[int]) -> "ResponseShape":
+        names = None if fields is None else [name.strip() for name in fields.split(",") if name.strip()]
+        return cls(names, series, precision)
+
+    @property
+    def needs_series(self) -> bool:
+        return any(field in self.fields for field in SERIES_FIELDS)
+
+    @property
+    def needs_break_even(self) -> bool:
+        return "break_even_month" in self.fields
+
+    def series_points(self, monthly_profits: np.ndarray) -> np.ndarray:
+        # Lucro acumulado no fim de cada período; se o horizonte não fecha o último período,
+        # o último ponto é o mês final
+        step = SERIES_STEPS[self.series]
+        if step > 1:
+            months = monthly_profits.shape[-1]
+            index = np.arange(step - 1, months, step)
+            if months and (not len(index) or index[-1] != months - 1):
+                index = np.append(index, months - 1)
+            monthly_profits = monthly_profits[..., index]
+        if self.precision is not None:
+            monthly_profits = np.round(monthly_profits, self.precision)
+        return monthly_profits
+
+    def rows(self, names: Sequence[str], values: Dict[str, Sequence], series=None) -> List[dict]:
+        # values traz as colunas escalares (e o total_cost, se houver série); series é a matriz
+        # cenários x meses do lucro acumulado ou uma lista de arrays, um por cenário
+        if not len(names):
+            return []
+        if self.needs_series and not isinstance(series, np.ndarray):
+            series = np.array(series, dtype=np.float64).reshape(len(names), -1)
+        columns = []
+        for field in self.fields:
+            if field == "name":
+                column = names
+            elif field == "monthly_profits":
+                column = self.series_points(series)
+            elif field == "roi_over_time":
+                column = self.series_points(roi_over_time(series, values["total_cost"]))
+            elif field == "payback":
+                column = self.series_points(payback(series, values["total_cost"]))
+            else:
+                column = values[field]
+                if field in FLOAT_FIELDS and self.precision is not None:
+                    column = np.round(np.asarray(column, dtype=np.float64), self.precision)
+                if isinstance(column, np.ndarray):
+                    column = column.tolist()
+            columns.append(column)
+        return [dict(zip(self.fields, row)) for row in zip(*columns)]
@@ -0,0 +1,104 @@
+import secrets
+from itertools import repeat
+from typing import Dict, Optional
+
+import numpy as np
+
+import config
+import pools
+from estimator import INTEGER_SCENARIO_FIELDS, SCENARIO_FIELDS, ScenarioBatch
+
+
+def _sample(spec, rng: np.random.Generator, size: int) -> np.ndarray:
+    if not isinstance(spec, dict):
+        return np.full(size, float(spec))
+
+    kind = spec["kind"]
+    if kind == "triangular":
+        if spec["low"] == spec["high"]:
+            return np.full(size, float(spec["low"]))
+        return rng.triangular(spec["low"], spec["mode"], spec["high"], size)
+    elif kind == "normal":
+        return rng.normal(spec["mean"], spec["std"], size)
+    elif kind == "uniform":
+        return rng.uniform(spec["low"], spec["high"], size)
+    else:
+        return rng.lognormal(spec["mean"], spec["std"], size)
+
+
+def run_chunk(parameters: Dict, projection_months: int, seed: np.random.SeedSequence, size: int):
+    # Sorteia um bloco de cenários e passa pelo mesmo kernel vetorizado do /calculate
+    rng = np.random.default_rng(seed)
+    sampled = {}
+    clipped = {}
+    for field in SCENARIO_FIELDS:
+        # custos, retornos e prazos negativos não fazem sentido no modelo: viram 0, e a resposta
+        # informa quantos sorteios foram cortados (o corte desloca média e percentis para cima)
+        values = _sample(parameters[field], rng, size)
+        negative = values < 0
+        clipped[field] = int(negative.sum())
+        values = np.where(negative, 0.0, values)
+        if field in INTEGER_SCENARIO_FIELDS:
+            values = np.rint(values).astype(np.int64)
+        sampled[field] = values
+
+    roi_data = ScenarioBatch(**sampled).estimate_roi(projection_months)
+    return roi_data["roi"], roi_data["break_even_month"], clipped
+
+
+def _summary(values: np.ndarray, bins: int) -> Optional[Dict]:
+    if values.size == 0:
+        return None
+    counts, edges = np.histogram(values, bins=bins)
+    percentiles = np.percentile(values, config.SIMULATION_PERCENTILES)
+    return {
+        "mean": float(values.mean()),
+        "std": float(values.std()),
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "percentiles": {f"p{p}": float(v) for p, v in zip(config.SIMULATION_PERCENTILES, percentiles)},
+        "histogram": {"counts": counts.tolist(), "edges": edges.tolist()}
+    }
+
+
+def simulate(
+    parameters: Dict,
+    projection_months: int,
+    draws: int,
+    seed: Optional[int] = None,
+    bins: int = 50,
+    parallel: Optional[bool] = None
+) -> Dict:
+    if seed is None:
+        seed = secrets.randbits(63)
+
+    # Os blocos e suas sementes não dependem do pool, então o resultado é o mesmo em série ou em paralelo
+    chunk = max(config.SIMULATION_CHUNK_DRAWS, 1)
+    sizes = [min(chunk, draws - start) for start in range(0, draws, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if parallel is None:
+        parallel = draws >= config.SIMULATION_PARALLEL_THRESHOLD
+    if parallel and pools.parallel_enabled() and len(sizes) > 1:
+        chunks = list(pools.process_pool().map(run_chunk, repeat(parameters), repeat(projection_months), seeds, sizes))
+    else:
+        chunks = [run_chunk(parameters, projection_months, s, size) for s, size in zip(seeds, sizes)]
+
+    roi = np.concatenate([roi for roi, _, _ in chunks])
+    break_even = np.concatenate([break_even for _, break_even, _ in chunks])
+    clipped = {field: sum(counts[field] for _, _, counts in chunks) / draws for field in SCENARIO_FIELDS}
+    reached = break_even >= 0
+
+    return {
+        "draws": draws,
+        "seed": seed,
+        "projection_months": projection_months,
+        "probability_of_loss": float((roi < 0).mean()),
+        "clipped_fraction": clipped,
+        "roi": _summary(roi, bins),
+        "break_even_month": {
+            "probability_never": float((~reached).mean()),
+            "probability_within_projection": float((reached & (break_even <= projection_months)).mean()),
+            "distribution": _summary(break_even[reached].astype(np.float64), bins)
+        }
+    }
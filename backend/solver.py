@@ -0,0 +1,143 @@
+from typing import Dict, List
+
+import numpy as np
+
+import config
+from estimator import INTEGER_SCENARIO_FIELDS, ScenarioBatch
+
+# Campo que se busca minimizar para atingir a meta; nos demais (custos e prazos) a resposta é o máximo tolerável
+MINIMIZED_FIELDS = ("monthly_return_estimate",)
+
+
+def _evaluate(parameters: Dict[str, np.ndarray], field: str, candidate: np.ndarray, projection_months: int):
+    return ScenarioBatch(**dict(parameters, **{field: candidate})).estimate_roi(projection_months)
+
+
+def _meets(roi_data: Dict[str, np.ndarray], target: str, target_value: np.ndarray) -> np.ndarray:
+    if target == "roi":
+        return roi_data["roi"] >= target_value
+    break_even = roi_data["break_even_month"]
+    return (break_even >= 0) & (break_even <= target_value)
+
+
+def _analytic(parameters: Dict[str, np.ndarray], field: str, target: str, target_value: np.ndarray, projection_months: int) -> np.ndarray:
+    investment = parameters["investment_cost"]
+    operational = parameters["monthly_operational_cost"]
+    development = parameters["development_months"]
+    monthly_return = parameters["monthly_return_estimate"]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if target == "roi":
+            # roi = (P * retorno - custo total) / custo total, com P = meses de retorno no horizonte
+            profit_months = np.maximum(projection_months - parameters["time_to_results_months"], 0)
+            total_cost = investment + operational * development
+            needed_cost = np.where(1 + target_value > 0, profit_months * monthly_return / (1 + target_value), np.nan)
+            if field == "monthly_return_estimate":
+                value = np.where((profit_months > 0) & (total_cost > 0), (1 + target_value) * total_cost / profit_months, np.nan)
+            elif field == "investment_cost":
+                value = needed_cost - operational * development
+            else:
+                value = np.where(development > 0, (needed_cost - investment) / development, np.nan)
+        else:
+            # Acumulado no mês M: -investimento - custo * M + retorno * k, com k = meses de retorno até M
+            first_return_month = np.maximum(np.maximum(development + 1, parameters["time_to_results_months"]), 1)
+            return_months = np.maximum(target_value - first_return_month + 1, 0)
+            if field == "monthly_return_estimate":
+                value = np.where(return_months > 0, (investment + operational * target_value) / return_months, np.nan)
+            elif field == "investment_cost":
+                value = monthly_return * return_months - operational * target_value
+            else:
+                value = np.where(target_value > 0, (monthly_return * return_months - investment) / target_value, np.nan)
+
+    if field in MINIMIZED_FIELDS:
+        return np.maximum(value, 0.0)
+    return np.where(value >= 0, value, np.nan)
+
+
+def _independent(parameters: Dict[str, np.ndarray], field: str, target: str) -> np.ndarray:
+    # Sem meses de desenvolvimento o custo operacional não entra no custo total, e o ROI não depende dele
+    if field == "monthly_operational_cost" and target == "roi":
+        return parameters["development_months"] == 0
+    return np.zeros(len(parameters[field]), dtype=bool)
+
+
+def _polish(parameters, field, target, target_value, projection_months, value):
+    # A fórmula dá a fronteira exata; o arredondamento pode deixá-la alguns ulps do lado errado
+    sign = 1.0 if field in MINIMIZED_FIELDS else -1.0
+    for step in range(16):
+        roi_data = _evaluate(parameters, field, np.nan_to_num(value), projection_months)
+        missed = np.isfinite(value) & ~_meets(roi_data, target, target_value)
+        if not missed.any():
+            break
+        value = np.where(missed, value + sign * np.abs(np.spacing(value)) * 2 ** step, value)
+    return value
+
+
+def _integer_search(parameters, field, target, target_value, projection_months) -> np.ndarray:
+    # Busca binária vetorizada pelo maior prazo que ainda atinge a meta (meta piora com prazos maiores)
+    size = len(target_value)
+    low = np.zeros(size, dtype=np.int64)
+    high = np.full(size, config.SOLVE_MAX_MONTHS + 1, dtype=np.int64)
+    feasible = _meets(_evaluate(parameters, field, low, projection_months), target, target_value)
+
+    active = feasible & (high - low > 1)
+    while active.any():
+        middle = (low + high) // 2
+        ok = _meets(_evaluate(parameters, field, middle, projection_months), target, target_value)
+        low = np.where(active & ok, middle, low)
+        high = np.where(active & ~ok, middle, high)
+        active = feasible & (high - low > 1)
+
+    return np.where(feasible, low, np.nan)
+
+
+def goal_seek(scenarios, field: str, target: str, target_value, projection_months: int) -> List[Dict]:
+    batch = ScenarioBatch.from_scenarios(scenarios)
+    parameters = {
+        "investment_cost": batch.investment_cost,
+        "monthly_operational_cost": batch.monthly_operational_cost,
+        "development_months": batch.development_months,
+        "monthly_return_estimate": batch.monthly_return_estimate,
+        "time_to_results_months": batch.time_to_results_months
+    }
+    target_value = np.broadcast_to(np.asarray(target_value, dtype=np.float64), (len(batch),))
+
+    # unbounded: qualquer valor do campo atinge a meta, então não há máximo.
+    # capped: a busca inteira parou em SOLVE_MAX_MONTHS ainda atingindo a meta (o máximo real é maior ou igual)
+    unbounded = np.zeros(len(batch), dtype=bool)
+    capped = np.zeros(len(batch), dtype=bool)
+    if field in INTEGER_SCENARIO_FIELDS:
+        value = _integer_search(parameters, field, target, target_value, projection_months)
+        capped = np.isfinite(value) & (value >= config.SOLVE_MAX_MONTHS)
+    else:
+        value = _analytic(parameters, field, target, target_value, projection_months)
+        value = _polish(parameters, field, target, target_value, projection_months, value)
+        if field in MINIMIZED_FIELDS:
+            # Se a meta já vale com retorno zero (sem custo, ou sem meses de retorno no horizonte), o mínimo é 0
+            zero = np.zeros_like(parameters[field])
+            value = np.where(_meets(_evaluate(parameters, field, zero, projection_months), target, target_value), 0.0, value)
+        else:
+            independent = _independent(parameters, field, target)
+            if independent.any():
+                unbounded = independent & _meets(_evaluate(parameters, field, parameters[field], projection_months), target, target_value)
+                value = np.where(unbounded, parameters[field], value)
+
+    solved = np.isfinite(value)
+    candidate = np.where(solved, value, parameters[field]).astype(parameters[field].dtype)
+    roi_data = _evaluate(parameters, field, candidate, projection_months)
+    feasible = solved & _meets(roi_data, target, target_value)
+
+    results = []
+    for i, scenario in enumerate(scenarios):
+        results.append({
+            "name": getattr(scenario, "name", "unknown"),
+            "field": field,
+            "bound": "minimum" if field in MINIMIZED_FIELDS else "maximum",
+            "feasible": bool(feasible[i]),
+            "value": candidate[i].item() if feasible[i] and not unbounded[i] else None,
+            "unbounded": bool(unbounded[i]),
+            "capped": bool(capped[i]),
+            "roi": roi_data["roi"][i].item() if feasible[i] else None,
+            "break_even_month": roi_data["break_even_month"][i].item() if feasible[i] else None
+        })
+    return results
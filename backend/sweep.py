@@ -0,0 +1,133 @@
+import math
+from itertools import repeat
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import config
+import pools
+from estimator import INTEGER_SCENARIO_FIELDS, SCENARIO_FIELDS, ScenarioBatch
+
+Axis = Tuple[str, np.ndarray]
+
+
+def build_axes(ranges: Dict[str, Dict]) -> List[Axis]:
+    if not ranges:
+        raise ValueError("at least one range is required")
+    axes = []
+    for field, spec in ranges.items():
+        if field not in SCENARIO_FIELDS:
+            raise ValueError(f"{field} cannot be swept; choose from {', '.join(SCENARIO_FIELDS)}")
+        if spec.get("values") is not None:
+            values = np.asarray(spec["values"], dtype=np.float64)
+        else:
+            values = np.linspace(spec["start"], spec["stop"], spec["steps"])
+        if field in INTEGER_SCENARIO_FIELDS:
+            values = np.rint(values).astype(np.int64)
+        axes.append((field, values))
+    return axes
+
+
+def _parameters(base: Dict, size: int) -> Dict[str, np.ndarray]:
+    return {field: np.full(size, base[field]) for field in SCENARIO_FIELDS}
+
+
+def evaluate_chunk(base: Dict, axes: List[Axis], projection_months: int, start: int, stop: int):
+    # Pontos [start, stop) da grade em ordem C; cada eixo é indexado sem materializar o produto cartesiano
+    shape = tuple(len(values) for _, values in axes)
+    parameters = _parameters(base, stop - start)
+    for (field, values), index in zip(axes, np.unravel_index(np.arange(start, stop), shape)):
+        parameters[field] = values[index]
+
+    roi_data = ScenarioBatch(**parameters).estimate_roi(projection_months)
+    return roi_data["roi"], roi_data["break_even_month"]
+
+
+def tornado(base: Dict, axes: List[Axis], projection_months: int) -> Tuple[float, List[Dict]]:
+    # Um parâmetro por vez nos extremos da sua faixa, os demais fixos no cenário base
+    parameters = _parameters(base, 1 + 2 * len(axes))
+    for i, (field, values) in enumerate(axes):
+        parameters[field][1 + 2 * i] = values.min()
+        parameters[field][2 + 2 * i] = values.max()
+    roi = ScenarioBatch(**parameters).estimate_roi(projection_months)["roi"].tolist()
+
+    bars = []
+    for i, (field, values) in enumerate(axes):
+        low, high = roi[1 + 2 * i], roi[2 + 2 * i]
+        bars.append({
+            "field": field,
+            "low": values.min().item(),
+            "high": values.max().item(),
+            "roi_at_low": low,
+            "roi_at_high": high,
+            "swing": abs(high - low)
+        })
+    bars.sort(key=lambda bar: bar["swing"], reverse=True)
+    return roi[0], bars
+
+
+def _point(axes: List[Axis], shape: Tuple[int, ...], flat_index: int) -> Dict:
+    index = np.unravel_index(flat_index, shape)
+    return {field: values[i].item() for (field, values), i in zip(axes, index)}
+
+
+def sweep(
+    base: Dict,
+    ranges: Dict[str, Dict],
+    projection_months: int,
+    include_surfaces: bool = True,
+    chunk_size: Optional[int] = None
+) -> Dict:
+    axes = build_axes(ranges)
+    shape = tuple(len(values) for _, values in axes)
+    total = math.prod(shape)
+    if total > config.SWEEP_MAX_POINTS:
+        raise ValueError(f"grid has {total} points; the limit is {config.SWEEP_MAX_POINTS}")
+
+    chunk = max(chunk_size or config.SWEEP_CHUNK_POINTS, 1)
+    starts = list(range(0, total, chunk))
+    stops = [min(start + chunk, total) for start in starts]
+    if total >= config.SWEEP_PARALLEL_THRESHOLD and pools.parallel_enabled() and len(starts) > 1:
+        chunks = pools.process_pool().map(evaluate_chunk, repeat(base), repeat(axes), repeat(projection_months), starts, stops)
+    else:
+        chunks = (evaluate_chunk(base, axes, projection_months, start, stop) for start, stop in zip(starts, stops))
+
+    # Agrega bloco a bloco; as superfícies só são guardadas quando cabem na resposta
+    keep_surfaces = include_surfaces and total <= config.SWEEP_MAX_SURFACE_POINTS
+    roi_parts, break_even_parts = [], []
+    best, worst = (-np.inf, 0), (np.inf, 0)
+    roi_sum, losses, reached = 0.0, 0, 0
+    for start, (roi, break_even) in zip(starts, chunks):
+        i, j = int(roi.argmax()), int(roi.argmin())
+        if roi[i] > best[0]:
+            best = (roi[i].item(), start + i)
+        if roi[j] < worst[0]:
+            worst = (roi[j].item(), start + j)
+        roi_sum += roi.sum()
+        losses += int((roi < 0).sum())
+        reached += int((break_even >= 0).sum())
+        if keep_surfaces:
+            roi_parts.append(roi)
+            break_even_parts.append(break_even)
+
+    base_roi, bars = tornado(base, axes, projection_months)
+    result = {
+        "axes": [{"field": field, "values": values.tolist()} for field, values in axes],
+        "points": total,
+        "chunks": len(starts),
+        "base_roi": base_roi,
+        "roi": {"min": worst[0], "max": best[0], "mean": float(roi_sum / total)},
+        "share_of_loss": losses / total,
+        "share_break_even": reached / total,
+        "best": {"roi": best[0], "parameters": _point(axes, shape, best[1])},
+        "worst": {"roi": worst[0], "parameters": _point(axes, shape, worst[1])},
+        "tornado": bars,
+        "surfaces": None
+    }
+    if keep_surfaces:
+        result["surfaces"] = {
+            "shape": list(shape),
+            "roi": np.concatenate(roi_parts).reshape(shape).tolist(),
+            "break_even_month": np.concatenate(break_even_parts).reshape(shape).tolist()
+        }
+    return result
@@ -0,0 +1,105 @@
+"""Measure how much of a /calculate request goes to serializing the response.
+
+Compares FastAPI's default path (jsonable_encoder + json) with the backend's encoders
+(orjson over the NumPy series, and MessagePack), reporting each as a share of
+compute + serialization time.
+
+Usage:
+    python benchmarks/bench_serialization.py --scenarios 1000 5000 --months 120
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from bench_suite import _models, _scenarios  # noqa: E402
+
+
+def _median_seconds(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def _encoders():
+    from fastapi.encoders import jsonable_encoder
+    from starlette.responses import JSONResponse
+
+    import serialization
+
+    def default(results):
+        # O que o FastAPI faz com uma lista de dicts devolvida pelo handler
+        listed = [dict(result, monthly_profits=result["monthly_profits"].tolist()) for result in results]
+        return JSONResponse(jsonable_encoder(listed)).body
+
+    encoders = {"fastapi_default": default, "json": serialization.dumps_json}
+    if serialization.msgpack_available():
+        encoders["msgpack"] = serialization.dumps_msgpack
+    return encoders
+
+
+def run(scenario_counts, projection_months, repeat: int) -> dict:
+    from estimator import project_scenarios
+
+    encoders = _encoders()
+    results = []
+    for count in scenario_counts:
+        for months in projection_months:
+            scenarios = _scenarios(count)
+            compute_s = _median_seconds(lambda: project_scenarios(_models(scenarios), months), repeat)
+            projections = project_scenarios(_models(scenarios), months)
+            payload = [
+                {
+                    "name": scenario["name"],
+                    "roi": projection.roi,
+                    "total_cost": projection.total_cost,
+                    "total_return": projection.total_return,
+                    "break_even_month": projection.break_even_month,
+                    "monthly_profits": projection.monthly_profits
+                }
+                for scenario, projection in zip(scenarios, projections)
+            ]
+            for name, encode in encoders.items():
+                encode_s = _median_seconds(lambda: encode(payload), repeat)
+                results.append({
+                    "encoder": name,
+                    "scenarios": count,
+                    "projection_months": months,
+                    "compute_s": compute_s,
+                    "serialize_s": encode_s,
+                    "serialize_share": encode_s / (compute_s + encode_s),
+                    "bytes": len(encode(payload))
+                })
+    return {"results": results}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--months", type=int, nargs="+", default=[120])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print the raw results as JSON")
+    args = parser.parse_args()
+
+    report = run(args.scenarios, args.months, args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    for r in report["results"]:
+        print(
+            f"{r['encoder']:<16} n={r['scenarios']:<6} months={r['projection_months']:<5} "
+            f"compute={r['compute_s'] * 1000:8.1f} ms  serialize={r['serialize_s'] * 1000:8.1f} ms  "
+            f"share={r['serialize_share']:6.1%}  size={r['bytes'] / 1e6:6.2f} MB"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""Benchmark the estimator and the API endpoints across scenario counts and horizons.
+
+Usage:
+    python benchmarks/bench_suite.py --output bench_results.json
+    python benchmarks/bench_suite.py --quick --compare baseline.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+import numpy as np  # noqa: E402
+
+SCENARIO_COUNTS = [1, 10, 100, 1000, 10000]
+PROJECTION_MONTHS = [12, 120, 1200]
+QUICK_SCENARIO_COUNTS = [1, 10, 100]
+QUICK_PROJECTION_MONTHS = [12, 120]
+
+# Casos caros por cenário ficam limitados para a suíte terminar em tempo razoável
+MAX_SCENARIOS = {"export_to_pdf": 100, "api_export_pdf": 1000}
+
+
+def _scenarios(count: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "name": f"Scenario {i}",
+            "investment_cost": float(rng.integers(50000, 250000)),
+            "monthly_operational_cost": float(rng.integers(10000, 50000)),
+            "num_people": int(rng.integers(1, 10)),
+            "development_months": int(rng.integers(1, 12)),
+            "monthly_return_estimate": float(rng.integers(10000, 90000)),
+            "time_to_results_months": int(rng.integers(1, 18)),
+            "technologies": ["Python"]
+        }
+        for i in range(count)
+    ]
+
+
+def _models(scenarios: list) -> list:
+    from estimator import DataInitiativeROI
+
+    return [DataInitiativeROI(**{k: v for k, v in s.items() if k != "name"}) for s in scenarios]
+
+
+def _estimator_cases():
+    # Modelos novos a cada execução: a projeção é memorizada na instância
+    def estimate_roi(scenarios, months):
+        for model in _models(scenarios):
+            model.estimate_roi(months)
+
+    def break_even(scenarios, months):
+        for model in _models(scenarios):
+            model._calculate_break_even_month()
+
+    def export_to_csv(scenarios, months):
+        for model in _models(scenarios):
+            model.export_to_csv(months)
+
+    def export_to_pdf(scenarios, months):
+        for model in _models(scenarios):
+            model.export_to_pdf(model.estimate_roi(months))
+
+    return {
+        "estimate_roi": estimate_roi,
+        "_calculate_break_even_month": break_even,
+        "export_to_csv": export_to_csv,
+        "export_to_pdf": export_to_pdf
+    }
+
+
+def _api_cases(warm_cache: bool):
+    from fastapi.testclient import TestClient
+
+    import main
+
+    client = TestClient(main.app)
+
+    def columns(scenarios):
+        return {field: [scenario[field] for scenario in scenarios] for field in scenarios[0]}
+
+    def call(path, body=lambda scenarios: scenarios):
+        def run(scenarios, months):
+            if not warm_cache:
+                main.result_cache.clear()
+            response = client.post(f"{path}?projection_months={months}", json=body(scenarios))
+            response.raise_for_status()
+        return run
+
+    return {
+        "api_calculate": call("/calculate"),
+        "api_calculate_columnar": call("/calculate/columnar", columns),
+        "api_export_csv": call("/export/csv"),
+        "api_export_pdf": call("/export/pdf")
+    }
+
+
+def run_suite(scenario_counts, projection_months, repeat: int, warm_cache: bool, only=None) -> dict:
+    cases = dict(_estimator_cases(), **_api_cases(warm_cache))
+    results = []
+    for name, case in cases.items():
+        if only and name not in only:
+            continue
+        for count in scenario_counts:
+            if count > MAX_SCENARIOS.get(name, count):
+                continue
+            scenarios = _scenarios(count)
+            for months in projection_months:
+                case(scenarios, months)  # aquecimento
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    case(scenarios, months)
+                    timings.append(time.perf_counter() - started)
+                median = statistics.median(timings)
+                results.append({
+                    "case": name,
+                    "scenarios": count,
+                    "projection_months": months,
+                    "repeat": repeat,
+                    "best_s": min(timings),
+                    "median_s": median,
+                    "scenarios_per_s": count / median if median > 0 else None
+                })
+                print(f"{name:28} n={count:<6} months={months:<5} median={median * 1000:10.2f} ms")
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "warm_cache": warm_cache
+        },
+        "results": results
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    # Regressão: latência mediana acima de (1 + tolerance) vezes a do baseline no mesmo ponto
+    reference = {(r["case"], r["scenarios"], r["projection_months"]): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        key = (result["case"], result["scenarios"], result["projection_months"])
+        previous = reference.get(key)
+        if previous is None:
+            continue
+        ratio = result["median_s"] / previous["median_s"] if previous["median_s"] > 0 else 1.0
+        if ratio > 1 + tolerance:
+            regressions.append(dict(result, baseline_median_s=previous["median_s"], slowdown=ratio))
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="baseline results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before flagging (0.25 = 25%%)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="smaller scenario counts and horizons")
+    parser.add_argument("--warm-cache", action="store_true", help="keep the API result cache between runs")
+    parser.add_argument("--case", action="append", help="run only this case (may be repeated)")
+    args = parser.parse_args()
+
+    # O baseline é lido antes de rodar: gravar os resultados por cima dele faria a execução se comparar consigo mesma
+    baseline = None
+    if args.compare:
+        if os.path.abspath(args.compare) == os.path.abspath(args.output):
+            parser.error("--compare and --output must be different files")
+        with open(args.compare) as source:
+            baseline = json.load(source)
+
+    counts = QUICK_SCENARIO_COUNTS if args.quick else SCENARIO_COUNTS
+    months = QUICK_PROJECTION_MONTHS if args.quick else PROJECTION_MONTHS
+    current = run_suite(counts, months, args.repeat, args.warm_cache, args.case)
+
+    with open(args.output, "w") as output:
+        json.dump(current, output, indent=2)
+    print(f"results written to {args.output}")
+
+    if baseline is not None:
+        regressions = compare(current, baseline, args.tolerance)
+        for r in regressions:
+            print(
+                f"REGRESSION {r['case']} n={r['scenarios']} months={r['projection_months']}: "
+                f"{r['median_s'] * 1000:.2f} ms vs {r['baseline_median_s'] * 1000:.2f} ms ({r['slowdown']:.2f}x)"
+            )
+        if regressions:
+            return 1
+        print("no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
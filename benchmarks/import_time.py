@@ -0,0 +1,76 @@
+"""Measure backend import cost per module and fail if startup exceeds a budget.
+
+Usage:
+    python benchmarks/import_time.py --budget-ms 1500 --top 15
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+
+# Motores de relatório que não podem ser carregados só para servir o /calculate
+LAZY_MODULES = ("reportlab", "fpdf", "pyarrow", "msgpack", "csv_report", "pdf_report", "columnar")
+
+
+def measure(module: str = "main") -> dict:
+    # Processo novo com -X importtime: cada linha traz custo próprio e acumulado em microssegundos
+    code = f"import sys, json; import {module}; print(json.dumps(sorted(sys.modules)))"
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    modules = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = {"self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000}
+
+    loaded = set(json.loads(completed.stdout))
+    return {
+        "module": module,
+        "total_ms": modules[module]["cumulative_ms"],
+        "modules": modules,
+        "lazy_modules_loaded": sorted(name for name in LAZY_MODULES if name in loaded)
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("ROI_IMPORT_BUDGET_MS", "1500")))
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=3, help="keep the best of N runs to reduce noise")
+    parser.add_argument("--json", dest="json_path", help="write the full result to this file")
+    args = parser.parse_args()
+
+    result = min((measure(args.module) for _ in range(max(args.repeat, 1))), key=lambda r: r["total_ms"])
+
+    print(f"import {args.module}: {result['total_ms']:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    ranked = sorted(result["modules"].items(), key=lambda item: item[1]["self_ms"], reverse=True)
+    for name, cost in ranked[:args.top]:
+        print(f"  {cost['self_ms']:8.1f} ms self  {cost['cumulative_ms']:8.1f} ms cumulative  {name}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as output:
+            json.dump(result, output, indent=2)
+
+    failures = []
+    if result["lazy_modules_loaded"]:
+        failures.append(f"report engines loaded at startup: {', '.join(result['lazy_modules_loaded'])}")
+    if result["total_ms"] > args.budget_ms:
+        failures.append(f"startup took {result['total_ms']:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
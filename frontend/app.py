@@ -2,9 +2,84 @@ import streamlit as st
 import requests
 import plotly.graph_objects as go
 import base64
+import json
+import os
+import threading
+from requests.adapters import HTTPAdapter
 
 st.set_page_config(page_title="Open DataROI", layout="wide")
 
+# Endereço do backend e timeouts (conexão, leitura) configuráveis por ambiente
+BACKEND_URL = os.getenv("ROI_BACKEND_URL", "http://localhost:8000").rstrip("/")
+CONNECT_TIMEOUT = float(os.getenv("ROI_BACKEND_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT = float(os.getenv("ROI_BACKEND_READ_TIMEOUT", "30"))
+EXPORT_READ_TIMEOUT = float(os.getenv("ROI_BACKEND_EXPORT_TIMEOUT", "120"))
+RESULTS_TTL_SECONDS = int(os.getenv("ROI_FRONTEND_CACHE_TTL_SECONDS", "600"))
+# Acima desse total de pontos por gráfico o backend devolve as séries trimestrais ou anuais,
+# e acima de MARKER_MAX_POINTS os gráficos desenham só linhas
+CHART_MAX_POINTS = int(os.getenv("ROI_FRONTEND_CHART_MAX_POINTS", "6000"))
+MARKER_MAX_POINTS = int(os.getenv("ROI_FRONTEND_MARKER_MAX_POINTS", "1500"))
+SERIES_STEPS = (("monthly", 1), ("quarterly", 3), ("yearly", 12))
+RESULT_FIELDS = "name,roi,total_cost,total_return,break_even_month,roi_over_time,payback"
+
+
+@st.cache_resource
+def backend_adapter() -> HTTPAdapter:
+    # Um pool de conexões keep-alive por processo do Streamlit, reaproveitado entre reruns e usuários
+    # (o pool do urllib3 é thread-safe; a requests.Session não)
+    return HTTPAdapter(pool_connections=4, pool_maxsize=16)
+
+
+@st.cache_resource
+def _thread_sessions() -> threading.local:
+    return threading.local()
+
+
+def backend_session() -> requests.Session:
+    # Uma sessão por thread de script, todas montadas sobre o mesmo adapter
+    local = _thread_sessions()
+    if not hasattr(local, "session"):
+        local.session = requests.Session()
+        local.session.mount("http://", backend_adapter())
+        local.session.mount("https://", backend_adapter())
+    return local.session
+
+
+def _post(path: str, payload: str, projection_months: int, read_timeout: float, **params) -> requests.Response:
+    response = backend_session().post(
+        f"{BACKEND_URL}{path}",
+        params={"projection_months": projection_months, **params},
+        data=payload.encode(),
+        headers={"Content-Type": "application/json"},
+        timeout=(CONNECT_TIMEOUT, read_timeout)
+    )
+    response.raise_for_status()
+    return response
+
+
+# Resultados guardados por conjunto de cenários: reruns com os mesmos dados não voltam ao backend.
+# Erros levantam exceção e por isso não ficam no cache.
+@st.cache_data(ttl=RESULTS_TTL_SECONDS, max_entries=64, show_spinner=False)
+def fetch_results(payload: str, projection_months: int, series: str) -> list:
+    # Séries de ROI e payback já vêm calculadas pelo backend; a mensal bruta não é pedida
+    return _post("/calculate", payload, projection_months, READ_TIMEOUT, fields=RESULT_FIELDS, series=series).json()
+
+
+def chart_resolution(scenario_count: int, projection_months: int):
+    # Menor passo que mantém o gráfico abaixo de CHART_MAX_POINTS; os pontos caem no fim de cada período
+    for series, step in SERIES_STEPS:
+        if scenario_count * -(-projection_months // step) <= CHART_MAX_POINTS:
+            break
+    months = list(range(step, projection_months + 1, step))
+    if projection_months % step:
+        months.append(projection_months)
+    return series, months
+
+
+@st.cache_data(ttl=RESULTS_TTL_SECONDS, max_entries=16, show_spinner=False)
+def fetch_export(kind: str, payload: str, projection_months: int) -> bytes:
+    return _post(f"/export/{kind}", payload, projection_months, EXPORT_READ_TIMEOUT).content
+
 col1, col2 = st.columns([1, 5])
 
 with col1:
@@ -215,14 +290,27 @@ for key in selected_templates:
             "technologies": [t.strip() for t in techs.split(",") if t.strip()]
         })
 
-# Cálculo de ROI
-if st.button("Calculate ROI"):
-    response = requests.post(f"http://localhost:8000/calculate?projection_months={projection_months}", json=scenarios)
-
-    if response.ok:
-        data = response.json()
+# Cálculo de ROI: uma única chamada; os resultados continuam na tela enquanto os cenários não mudarem
+payload = json.dumps(scenarios, sort_keys=True)
+request_key = (payload, projection_months)
+# Modo ao vivo: cada alteração de slider ou campo já recalcula, sem esperar o botão
+live_updates = st.toggle("⚡ Live updates", value=False)
+if st.button("Calculate ROI") or live_updates:
+    st.session_state["calculated"] = request_key
+
+if st.session_state.get("calculated") == request_key:
+    try:
+        with st.spinner("Calculating..."):
+            series_resolution, chart_months = chart_resolution(len(scenarios), projection_months)
+            data = fetch_results(payload, projection_months, series_resolution)
+    except requests.RequestException:
+        data = None
+        st.error("🚫 Failed to reach the ROI backend.")
+
+    if data is not None:
         col1, col2 = st.columns(2)
-        chart_data = []
+        # WebGL (Scattergl) para muitas séries longas; marcadores só enquanto o gráfico é pequeno
+        line_mode = "lines+markers" if len(data) * len(chart_months) <= MARKER_MAX_POINTS else "lines"
 
         for result in data:
             name = result["name"]
@@ -248,20 +336,14 @@ if st.button("Calculate ROI"):
 
                 st.markdown(f"**Viability Level:** {risk_color}")
 
-            roi_over_time = []
-            for i, profit in enumerate(result["monthly_profits"]):
-                investment = result["total_cost"]
-                roi = (profit / investment) * 100 if investment > 0 else 0
-                roi_over_time.append(roi)
-            chart_data.append((name, roi_over_time))
         #Gráfico comparativo
         fig = go.Figure()
-        for name, roi_list in chart_data:
-            fig.add_trace(go.Scatter(
-                x=list(range(1, len(roi_list) + 1)),
-                y=roi_list,
-                mode="lines+markers",
-                name=name
+        for result in data:
+            fig.add_trace(go.Scattergl(
+                x=chart_months,
+                y=result["roi_over_time"],
+                mode=line_mode,
+                name=result["name"]
             ))
 
         fig.update_layout(
@@ -313,21 +395,11 @@ if st.button("Calculate ROI"):
         # Payback acumulado (Lucro - Custo)
         payback_fig = go.Figure()
         for result in data:
-            name = result["name"]
-            cumulative_profit = 0
-            cumulative_cost = result["total_cost"]
-            payback = []
-
-            for i, profit in enumerate(result["monthly_profits"]):
-                cumulative_profit += profit
-                net = cumulative_profit - cumulative_cost
-                payback.append(net)
-
-            payback_fig.add_trace(go.Scatter(
-                x=list(range(1, len(payback)+1)),
-                y=payback,
-                mode="lines+markers",
-                name=name
+            payback_fig.add_trace(go.Scattergl(
+                x=chart_months,
+                y=result["payback"],
+                mode=line_mode,
+                name=result["name"]
             ))
 
         payback_fig.update_layout(
@@ -347,38 +419,35 @@ if st.button("Calculate ROI"):
         st.markdown("### 📄 Export Results")
         colpdf, colcsv = st.columns(2)
 
-        #Generate PDF
+        # Exportações só são geradas quando alguém pede o download
         with colpdf:
-            pdf_resp = requests.post(
-                f"http://localhost:8000/export/pdf?projection_months={projection_months}",
-                json=scenarios
-            )
-            if pdf_resp.ok:
-                pdf_bytes = pdf_resp.content
-                st.download_button(
-                    label="📄 Download Detailed PDF Report",
-                    data=pdf_bytes,
-                    file_name="roi_report.pdf",
-                    mime="application/pdf"
-                )
-                st.success("Report generated with detailed viability analysis ✅")
-            else:
-                st.error("🚫 Failed to generate PDF report.")
-
+            if st.button("📄 Prepare PDF Report"):
+                st.session_state["pdf_requested"] = request_key
+            if st.session_state.get("pdf_requested") == request_key:
+                try:
+                    with st.spinner("Rendering PDF..."):
+                        pdf_bytes = fetch_export("pdf", payload, projection_months)
+                    st.download_button(
+                        label="📄 Download Detailed PDF Report",
+                        data=pdf_bytes,
+                        file_name="roi_report.pdf",
+                        mime="application/pdf"
+                    )
+                    st.success("Report generated with detailed viability analysis ✅")
+                except requests.RequestException:
+                    st.error("🚫 Failed to generate PDF report.")
 
         with colcsv:
-            csv_resp = requests.post(
-                f"http://localhost:8000/export/csv?projection_months={projection_months}",
-                json=scenarios
-            )
-
-            if csv_resp.ok:
-                csv_str = csv_resp.text
-                st.download_button(
-                    label="📈 Download CSV File",
-                    data=csv_str,
-                    file_name="roi_data.csv",
-                    mime="text/csv"
-                )
-            else:
-                st.error("❌ Failed to generate CSV.")
+            if st.button("📈 Prepare CSV File"):
+                st.session_state["csv_requested"] = request_key
+            if st.session_state.get("csv_requested") == request_key:
+                try:
+                    csv_bytes = fetch_export("csv", payload, projection_months)
+                    st.download_button(
+                        label="📈 Download CSV File",
+                        data=csv_bytes,
+                        file_name="roi_data.csv",
+                        mime="text/csv"
+                    )
+                except requests.RequestException:
+                    st.error("❌ Failed to generate CSV.")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# O backend é executado a partir de backend/ (ex.: `from estimator import ...`)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
@@ -0,0 +1,284 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import config
+import portfolio
+import simulation
+from estimator import SCENARIO_FIELDS, DataInitiativeROI
+from main import app
+
+client = TestClient(app)
+
+SIMULATION = {
+    "name": "Realistic example",
+    "investment_cost": {"kind": "triangular", "low": 120000, "mode": 150000, "high": 200000},
+    "monthly_operational_cost": {"kind": "normal", "mean": 35000, "std": 5000},
+    "development_months": {"kind": "uniform", "low": 4, "high": 8},
+    "monthly_return_estimate": {"kind": "lognormal", "mean": 9.0, "std": 0.5},
+    "time_to_results_months": 7,
+    "projection_months": 60,
+    "draws": 20000,
+    "seed": 42
+}
+
+
+def test_simulation_is_reproducible_for_a_seed():
+    first = client.post("/simulate", json=SIMULATION).json()
+    second = client.post("/simulate", json=SIMULATION).json()
+    assert first == second
+    assert first["draws"] == 20000
+    assert sum(first["roi"]["histogram"]["counts"]) == 20000
+    assert first["roi"]["percentiles"]["p5"] <= first["roi"]["percentiles"]["p50"] <= first["roi"]["percentiles"]["p95"]
+    assert 0 < first["probability_of_loss"] < 1
+
+    other_seed = client.post("/simulate", json=dict(SIMULATION, seed=7)).json()
+    assert other_seed["roi"] != first["roi"]
+
+
+def test_simulation_same_result_in_process_pool(monkeypatch):
+    monkeypatch.setattr(config, "SIMULATION_CHUNK_DRAWS", 3000)
+    monkeypatch.setattr(config, "PROCESS_POOL_WORKERS", 2)
+    parameters = {field: SIMULATION[field] for field in SCENARIO_FIELDS}
+
+    serial = simulation.simulate(parameters, 60, 10000, seed=1, parallel=False)
+    parallel = simulation.simulate(parameters, 60, 10000, seed=1, parallel=True)
+    assert serial == parallel
+
+
+def test_simulation_with_point_estimates_matches_estimator():
+    point = {
+        "investment_cost": 10000,
+        "monthly_operational_cost": 2000,
+        "development_months": 3,
+        "monthly_return_estimate": 5000,
+        "time_to_results_months": 4
+    }
+    expected = DataInitiativeROI(num_people=1, **point).estimate_roi(24)
+    result = client.post("/simulate", json=dict(point, projection_months=24, draws=10)).json()
+    assert result["roi"]["percentiles"]["p50"] == expected["roi"]
+    assert result["break_even_month"]["distribution"]["max"] == expected["break_even_month"]
+    assert result["probability_of_loss"] == 0
+    assert result["clipped_fraction"] == {field: 0.0 for field in SCENARIO_FIELDS}
+
+
+def test_simulation_reports_clipped_negative_draws():
+    # Normal centrada em zero: metade dos sorteios do custo operacional seria negativa
+    centered = dict(SIMULATION, monthly_operational_cost={"kind": "normal", "mean": 0, "std": 5000})
+    result = client.post("/simulate", json=centered).json()
+    assert result["clipped_fraction"]["monthly_operational_cost"] == pytest.approx(0.5, abs=0.02)
+    assert result["clipped_fraction"]["investment_cost"] == 0
+
+
+def test_simulation_rejects_invalid_distribution():
+    invalid = dict(SIMULATION, investment_cost={"kind": "triangular", "low": 10, "high": 5, "mode": 7})
+    assert client.post("/simulate", json=invalid).status_code == 422
+    assert client.post("/simulate", json=dict(SIMULATION, monthly_operational_cost={"kind": "normal"})).status_code == 422
+
+
+BASE = {
+    "name": "Realistic example",
+    "investment_cost": 150000,
+    "monthly_operational_cost": 35000,
+    "num_people": 4,
+    "development_months": 6,
+    "monthly_return_estimate": 50000,
+    "time_to_results_months": 7
+}
+
+
+def test_sweep_grid_matches_estimator():
+    request = {
+        "base": BASE,
+        "ranges": {
+            "monthly_return_estimate": {"start": 20000, "stop": 80000, "steps": 7},
+            "development_months": {"values": [2, 6, 12]},
+            "investment_cost": {"values": [100000, 200000]}
+        },
+        "projection_months": 36,
+        "chunk_size": 5
+    }
+    result = client.post("/sweep", json=request).json()
+    assert result["points"] == 42
+    assert result["chunks"] == 9
+    assert result["surfaces"]["shape"] == [7, 3, 2]
+
+    returns, months, investments = (axis["values"] for axis in result["axes"])
+    for i, monthly_return in enumerate(returns):
+        for j, development_months in enumerate(months):
+            for k, investment in enumerate(investments):
+                fields = dict(BASE, monthly_return_estimate=monthly_return, development_months=development_months, investment_cost=investment)
+                del fields["name"]
+                expected = DataInitiativeROI(**fields).estimate_roi(36)
+                assert result["surfaces"]["roi"][i][j][k] == expected["roi"]
+                assert result["surfaces"]["break_even_month"][i][j][k] == expected["break_even_month"]
+
+    assert result["roi"]["max"] == max(max(max(row) for row in plane) for plane in result["surfaces"]["roi"])
+    assert result["best"]["parameters"] == {"monthly_return_estimate": 80000, "development_months": 2, "investment_cost": 100000}
+    assert [bar["field"] for bar in result["tornado"]][0] == "monthly_return_estimate"
+    assert result["tornado"][0]["swing"] >= result["tornado"][-1]["swing"]
+
+
+def test_sweep_in_process_pool_without_surfaces(monkeypatch):
+    monkeypatch.setattr(config, "PROCESS_POOL_WORKERS", 2)
+    monkeypatch.setattr(config, "SWEEP_PARALLEL_THRESHOLD", 1)
+    request = {
+        "base": BASE,
+        "ranges": {
+            "monthly_operational_cost": {"start": 10000, "stop": 60000, "steps": 50},
+            "time_to_results_months": {"start": 1, "stop": 36, "steps": 36}
+        },
+        "include_surfaces": False,
+        "chunk_size": 400
+    }
+    parallel = client.post("/sweep", json=request).json()
+    monkeypatch.setattr(config, "PROCESS_POOL_WORKERS", 1)
+    serial = client.post("/sweep", json=request).json()
+    assert parallel == serial
+    assert parallel["surfaces"] is None
+    assert parallel["points"] == 1800
+
+
+def test_sweep_rejects_unknown_field_and_oversized_grid(monkeypatch):
+    assert client.post("/sweep", json={"base": BASE, "ranges": {"name": {"values": [1]}}}).status_code == 422
+    monkeypatch.setattr(config, "SWEEP_MAX_POINTS", 10)
+    oversized = {"base": BASE, "ranges": {"investment_cost": {"start": 0, "stop": 1, "steps": 11}}}
+    assert client.post("/sweep", json=oversized).status_code == 422
+
+
+def _solve(**request):
+    response = client.post("/solve", json=dict({"scenarios": [BASE], "projection_months": 60}, **request))
+    assert response.status_code == 200
+    return response.json()
+
+
+def _with(**overrides):
+    fields = dict(BASE, **overrides)
+    del fields["name"]
+    return DataInitiativeROI(**fields)
+
+
+def test_solve_minimum_return_for_break_even_month():
+    result = _solve(solve_for="monthly_return_estimate", target="break_even_month", target_value=12)[0]
+    assert result["feasible"] and result["bound"] == "minimum"
+    assert result["break_even_month"] <= 12
+    assert _with(monthly_return_estimate=result["value"])._calculate_break_even_month() <= 12
+    assert _with(monthly_return_estimate=result["value"] * 0.999)._calculate_break_even_month() > 12
+
+
+def test_solve_maximum_costs_for_target_roi():
+    for field in ("investment_cost", "monthly_operational_cost"):
+        result = _solve(solve_for=field, target="roi", target_value=1.5)[0]
+        assert result["feasible"] and result["bound"] == "maximum"
+        assert _with(**{field: result["value"]}).estimate_roi(60)["roi"] >= 1.5
+        assert _with(**{field: result["value"] * 1.001}).estimate_roi(60)["roi"] < 1.5
+
+
+def test_solve_integer_fields_by_bracketed_search():
+    result = _solve(solve_for="time_to_results_months", target="break_even_month", target_value=36)[0]
+    assert result["value"] == 8
+    assert _with(time_to_results_months=8)._calculate_break_even_month() <= 36
+    assert _with(time_to_results_months=9)._calculate_break_even_month() > 36
+
+    result = _solve(solve_for="development_months", target="roi", target_value=2)[0]
+    assert _with(development_months=result["value"]).estimate_roi(60)["roi"] >= 2
+    assert _with(development_months=result["value"] + 1).estimate_roi(60)["roi"] < 2
+
+
+def test_solve_batch_with_per_scenario_targets_and_infeasible_goal():
+    scenarios = [dict(BASE, name=f"s{i}") for i in range(3)]
+    results = _solve(scenarios=scenarios, solve_for="investment_cost", target="break_even_month", target_value=[36, 48, 3])
+    assert [r["name"] for r in results] == ["s0", "s1", "s2"]
+    assert (results[0]["value"], results[1]["value"]) == (240000, 420000)
+    assert results[2] == {
+        "name": "s2",
+        "field": "investment_cost",
+        "bound": "maximum",
+        "feasible": False,
+        "value": None,
+        "unbounded": False,
+        "capped": False,
+        "roi": None,
+        "break_even_month": None
+    }
+    assert client.post("/solve", json={"scenarios": scenarios, "solve_for": "investment_cost", "target": "roi", "target_value": [1]}).status_code == 422
+
+
+def test_solve_reports_unbounded_and_capped_answers():
+    # Sem desenvolvimento o custo operacional não entra no ROI: qualquer valor atinge a meta
+    no_development = dict(BASE, development_months=0)
+    result = _solve(scenarios=[no_development], solve_for="monthly_operational_cost", target="roi", target_value=1.5)[0]
+    assert result["feasible"] and result["unbounded"] and result["value"] is None
+    assert result["roi"] == pytest.approx(_with(development_months=0).estimate_roi(60)["roi"])
+    missed = _solve(scenarios=[no_development], solve_for="monthly_operational_cost", target="roi", target_value=100)[0]
+    assert not missed["feasible"] and not missed["unbounded"]
+
+    # Sem meses de retorno no horizonte o ROI é -1 para qualquer retorno mensal: o mínimo é 0
+    no_returns = dict(BASE, time_to_results_months=60)
+    result = _solve(scenarios=[no_returns], solve_for="monthly_return_estimate", target="roi", target_value=-1)[0]
+    assert result["feasible"] and result["value"] == 0 and not result["unbounded"]
+
+    # A busca inteira para no limite sem provar que não há máximo
+    result = _solve(solve_for="time_to_results_months", target="roi", target_value=-1)[0]
+    assert result["feasible"] and result["capped"] and result["value"] == config.SOLVE_MAX_MONTHS
+    assert not _solve(solve_for="time_to_results_months", target="break_even_month", target_value=36)[0]["capped"]
+
+
+def _brute_force(values, weights, caps):
+    best = 0.0
+    for mask in range(1 << len(values)):
+        chosen = [i for i in range(len(values)) if mask >> i & 1]
+        if all(sum(w[i] for i in chosen) <= cap for w, cap in zip(weights, caps)):
+            best = max(best, sum(values[i] for i in chosen))
+    return best
+
+
+def test_branch_and_bound_matches_brute_force():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        values = rng.integers(-50, 500, 10).astype(float)
+        weights = rng.integers(1, 300, (2, 10)).astype(float)
+        caps = np.array([500.0, 700.0])
+        expected = _brute_force(values, weights, caps)
+
+        exact = portfolio.branch_and_bound(values, weights, caps)
+        assert exact["value"] == expected
+        assert exact["upper_bound"] == expected and exact["complete"]
+        assert all(weights[:, exact["selected"]].sum(axis=1) <= caps)
+
+        approximate = portfolio.branch_and_bound(values, weights[:1], caps[:1], epsilon=0.1)
+        assert approximate["value"] >= 0.9 * _brute_force(values, weights[:1], caps[:1])
+
+
+def test_portfolio_endpoint_reports_gap_and_timing():
+    candidates = []
+    rng = np.random.default_rng(1)
+    for i in range(2000):
+        candidates.append(dict(
+            BASE,
+            name=f"initiative {i}",
+            investment_cost=float(rng.integers(10000, 300000)),
+            monthly_operational_cost=float(rng.integers(1000, 40000)),
+            monthly_return_estimate=float(rng.integers(0, 80000))
+        ))
+    request = {"candidates": candidates, "cost_cap": 5000000, "outlay_cap": 8000000, "objective": "npv"}
+
+    exact = client.post("/portfolio/optimize", json=request).json()
+    assert exact["totals"]["total_cost"] <= 5000000
+    assert exact["totals"]["cash_outlay"] <= 8000000
+    assert exact["objective_value"] == pytest.approx(exact["totals"]["npv"])
+    assert 0 <= exact["optimality_gap"] < 0.01
+    assert exact["solve_time_ms"] > 0
+
+    approximate = client.post("/portfolio/optimize", json=dict(request, mode="approximate", epsilon=0.05)).json()
+    assert approximate["error_bound"] == 0.05
+    assert approximate["objective_value"] >= 0.95 * exact["objective_value"]
+    assert approximate["nodes"] <= exact["nodes"]
+
+    assert client.post("/portfolio/optimize", json={"candidates": candidates[:3]}).status_code == 422
+
+
+def test_npv_without_discount_is_final_cumulative_profit():
+    metrics = portfolio.candidate_metrics([_with()], 60, 0.0)
+    assert metrics["npv"][0] == pytest.approx(_with().projection(60).monthly_profits[-1])
+    assert metrics["cash_outlay"][0] == -_with().projection(60).monthly_profits.min()
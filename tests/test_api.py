@@ -0,0 +1,595 @@
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import config
+import main
+from estimator import DataInitiativeROI
+import pdf_report
+from jobs import JobStore
+from main import _iter_csv, _pdf_rows, app, result_cache
+from models import ROIInput
+
+client = TestClient(app)
+
+SCENARIOS = [
+    {
+        "name": "Realistic example",
+        "investment_cost": 150000,
+        "monthly_operational_cost": 35000,
+        "num_people": 4,
+        "development_months": 6,
+        "monthly_return_estimate": 50000,
+        "time_to_results_months": 7,
+        "technologies": ["Python", "dbt"]
+    },
+    {
+        "name": "Pessimistic example",
+        "investment_cost": 180000.5,
+        "monthly_operational_cost": 40000.25,
+        "num_people": 5,
+        "development_months": 8,
+        "monthly_return_estimate": 30000.1,
+        "time_to_results_months": 10,
+        "technologies": []
+    }
+]
+
+
+def _model(scenario):
+    fields = {k: v for k, v in scenario.items() if k != "name"}
+    return DataInitiativeROI(**fields)
+
+
+def test_calculate_matches_estimator():
+    response = client.post("/calculate?projection_months=36", json=SCENARIOS)
+    assert response.status_code == 200
+
+    for scenario, result in zip(SCENARIOS, response.json()):
+        model = _model(scenario)
+        expected = model.estimate_roi(36)
+        assert result["name"] == scenario["name"]
+        for key in ("total_cost", "total_return", "roi", "break_even_month"):
+            assert result[key] == expected[key]
+        rows = list(csv.reader(io.StringIO(model.export_to_csv(36))))[1:]
+        assert result["monthly_profits"] == [float(profit) for _, profit in rows]
+
+
+def test_export_csv_rows():
+    response = client.post("/export/csv?projection_months=12", json=SCENARIOS)
+    assert response.status_code == 200
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["Scenario", "Month", "Profit"]
+    assert len(rows) == 1 + 12 * len(SCENARIOS)
+    assert rows[1][:2] == ["Realistic example", "1"]
+
+
+def test_export_pdf():
+    response = client.post("/export/pdf?projection_months=12", json=SCENARIOS)
+    assert response.status_code == 200
+    assert response.content.startswith(b"%PDF")
+
+
+def test_result_cache_shared_between_endpoints():
+    result_cache.clear()
+    before = result_cache.stats()
+    duplicated = SCENARIOS + [dict(SCENARIOS[0], name="Copy")]
+
+    first = client.post("/calculate?projection_months=48", json=duplicated).json()
+    assert first[2]["monthly_profits"] == first[0]["monthly_profits"]
+    after_calculate = client.get("/cache/stats").json()
+    assert after_calculate["misses"] - before["misses"] == 2
+    assert after_calculate["size"] == 2
+
+    client.post("/export/csv?projection_months=48", json=duplicated)
+    after_csv = client.get("/cache/stats").json()
+    assert after_csv["hits"] - after_calculate["hits"] == 2
+    assert after_csv["misses"] == after_calculate["misses"]
+
+
+def test_export_csv_streams_in_chunks(monkeypatch):
+    expected = client.post("/export/csv?projection_months=24", json=SCENARIOS).text
+
+    monkeypatch.setattr(config, "STREAM_CHUNK_SCENARIOS", 1)
+    monkeypatch.setattr(config, "CSV_STREAM_CHUNK_BYTES", 64)
+    inputs = [ROIInput(**scenario) for scenario in SCENARIOS]
+    chunks = list(_iter_csv(inputs, 24))
+    assert len(chunks) > len(SCENARIOS)
+    assert b"".join(chunks).decode() == expected
+    assert client.post("/export/csv?projection_months=24", json=SCENARIOS).text == expected
+
+
+def test_calculate_ndjson_stream(monkeypatch):
+    expected = client.post("/calculate?projection_months=24", json=SCENARIOS).json()
+    monkeypatch.setattr(config, "STREAM_CHUNK_SCENARIOS", 1)
+
+    by_query = client.post("/calculate?projection_months=24&stream=true", json=SCENARIOS)
+    by_header = client.post("/calculate?projection_months=24", json=SCENARIOS, headers={"Accept": "application/x-ndjson"})
+    for response in (by_query, by_header):
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert [json.loads(line) for line in response.text.splitlines()] == expected
+
+
+def test_export_columnar_arrow_and_parquet():
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    expected = client.post("/calculate?projection_months=24", json=SCENARIOS).json()
+
+    arrow = client.post("/export/columnar?projection_months=24&format=arrow", json=SCENARIOS)
+    assert arrow.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(arrow.content).read_all()
+
+    parquet = client.post("/export/columnar?projection_months=24&format=parquet", json=SCENARIOS)
+    assert pq.read_table(io.BytesIO(parquet.content)).to_pylist() == table.to_pylist()
+
+    for row, result in zip(table.to_pylist(), expected):
+        assert row["scenario"] == result["name"]
+        assert row["break_even_month"] == result["break_even_month"]
+        assert row["monthly_profits"] == result["monthly_profits"]
+        assert row["risk_level"].endswith("(Moderate viability)") == (0 <= result["roi"] < 1)
+
+    assert client.post("/export/columnar?projection_months=0", json=SCENARIOS).status_code == 422
+
+
+def test_export_pdf_splits_large_tables(monkeypatch):
+    many = [dict(SCENARIOS[i % 2], name=f"Scenario {i}") for i in range(95)]
+    monkeypatch.setattr(config, "PDF_ROWS_PER_TABLE", 20)
+
+    rows = _pdf_rows([ROIInput(**scenario) for scenario in many], 24)
+    assert len(rows) == 95
+    pages = pdf_report.render(rows, "2024-01-01 00:00").count(b"/Type /Page\n")
+    assert pages >= 5
+
+    pooled = client.post("/export/pdf?projection_months=24", json=many)
+    monkeypatch.setattr(config, "PDF_RENDER_WORKERS", 0)
+    inline = client.post("/export/pdf?projection_months=24", json=many)
+    for response in (pooled, inline):
+        assert response.status_code == 200
+        assert response.content.startswith(b"%PDF")
+
+
+def _wait_for(job_id, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = client.get(f"/jobs/{job_id}").json()
+        if status["status"] in ("done", "failed"):
+            return status
+        time.sleep(0.02)
+    raise AssertionError("job did not finish")
+
+
+def test_export_jobs_with_idempotency_and_expiry(monkeypatch, tmp_path):
+    store = JobStore(str(tmp_path), workers=1, ttl_seconds=60)
+    monkeypatch.setattr(main, "export_jobs", store)
+    headers = {"Idempotency-Key": "export-42"}
+
+    submitted = client.post("/jobs/export/csv?projection_months=24", json=SCENARIOS, headers=headers)
+    assert submitted.status_code == 202
+    job_id = submitted.json()["id"]
+    status = _wait_for(job_id)
+    assert status["status"] == "done" and status["progress"] == 1.0
+
+    download = client.get(status["result_url"])
+    assert download.text == client.post("/export/csv?projection_months=24", json=SCENARIOS).text
+    assert "roi_data.csv" in download.headers["content-disposition"]
+
+    retried = client.post("/jobs/export/csv?projection_months=24", json=SCENARIOS, headers=headers)
+    assert retried.status_code == 200 and retried.json()["id"] == job_id
+    conflict = client.post("/jobs/export/csv?projection_months=36", json=SCENARIOS, headers=headers)
+    assert conflict.status_code == 409
+
+    pdf = client.post("/jobs/export/pdf?projection_months=24", json=SCENARIOS).json()
+    assert client.get(_wait_for(pdf["id"])["result_url"]).content.startswith(b"%PDF")
+
+    store.ttl_seconds = 0
+    expired = client.post("/jobs/export/csv?projection_months=12", json=SCENARIOS).json()
+    assert client.get(f"/jobs/{expired['id']}").status_code == 404
+    assert client.get("/jobs/not-a-job/result").status_code == 404
+
+
+def test_export_jobs_shutdown_fails_queued_jobs(tmp_path):
+    store = JobStore(str(tmp_path), workers=1, ttl_seconds=60)
+    release = threading.Event()
+
+    def blocking(output, progress):
+        release.wait(5)
+        output.write(b"ok")
+
+    running, _ = store.submit("csv", "csv", "text/csv", blocking, "a")
+    queued, _ = store.submit("csv", "csv", "text/csv", lambda output, progress: output.write(b"ok"), "b", idempotency_key="retry-me")
+    while store.get(running["id"])["status"] != "running":
+        time.sleep(0.01)
+    store.shutdown()
+    release.set()
+
+    failed = store.get(queued["id"])
+    assert failed["status"] == "failed" and "shut down" in failed["error"]
+    # A mesma Idempotency-Key refaz o job que não chegou a rodar
+    retried, created = store.submit("csv", "csv", "text/csv", lambda output, progress: output.write(b"ok"), "b", idempotency_key="retry-me")
+    assert created and retried["id"] != queued["id"]
+    for _ in range(250):
+        if store.get(running["id"])["status"] == "done" and store.get(retried["id"])["status"] == "done":
+            break
+        time.sleep(0.02)
+    assert store.get(running["id"])["status"] == "done" and store.get(retried["id"])["status"] == "done"
+    store.shutdown()
+
+
+def test_metrics_exposition():
+    client.post("/calculate?projection_months=36", json=SCENARIOS)
+    csv_body = client.post("/export/csv?projection_months=36", json=SCENARIOS).content
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    assert "# TYPE roi_http_request_duration_seconds histogram" in lines
+    assert any(line.startswith('roi_http_request_duration_seconds_count{route="/calculate",method="POST",status="200"}') for line in lines)
+    assert any(line.startswith('roi_scenarios_per_request_bucket{route="/calculate",le="3.0"}') for line in lines)
+    assert any(line.startswith('roi_projection_months_per_request_sum{route="/export/csv"}') for line in lines)
+    assert "roi_http_requests_in_flight 1.0" in lines
+    streamed = next(line for line in lines if line.startswith("roi_csv_bytes_streamed_total "))
+    assert float(streamed.split()[1]) >= len(csv_body)
+    assert any(line.startswith("roi_result_cache_hits_total ") for line in lines)
+    assert any(line.startswith("roi_pdf_pool_workers ") for line in lines)
+
+
+def test_profiling_is_opt_in_and_reports_hot_functions(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "PROFILING_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "PROFILING_MAX_REPORTS", 2)
+
+    disabled = client.post("/calculate", json=SCENARIOS, headers={"X-Profile": "1"})
+    assert "x-profile-id" not in disabled.headers
+
+    monkeypatch.setattr(config, "PROFILING_ENABLED", True)
+    plain = client.post("/calculate", json=SCENARIOS)
+    assert "x-profile-id" not in plain.headers
+
+    profiled = client.post("/calculate?profile=1", json=SCENARIOS)
+    assert profiled.json() == plain.json()
+    report = client.get(f"/profiles/{profiled.headers['x-profile-id']}").json()
+    assert report["route"] == "/calculate" and report["trigger"] == "request"
+    own = [entry["own_seconds"] for entry in report["functions"]]
+    assert own and own == sorted(own, reverse=True)
+    assert any(entry["function"] == "_project" for entry in report["functions"])
+
+    streamed = client.post("/export/csv", json=SCENARIOS, headers={"X-Profile": "1"})
+    report = client.get(f"/profiles/{streamed.headers['x-profile-id']}").json()
+    assert any(entry["function"] == "iter_csv" for entry in report["functions"])
+
+    monkeypatch.setattr(config, "PROFILING_TOKEN", "secret")
+    assert "x-profile-id" not in client.post("/calculate?profile=1", json=SCENARIOS).headers
+    guarded = client.post("/calculate", json=SCENARIOS, headers={"X-Profile": "secret"}).headers["x-profile-id"]
+    assert client.get(f"/profiles/{guarded}").status_code == 403
+    assert client.get(f"/profiles/{guarded}?profile=wrong").status_code == 403
+    read = client.get(f"/profiles/{guarded}", headers={"X-Profile": "secret"})
+    assert read.json()["route"] == "/calculate" and "x-profile-id" not in read.headers
+    monkeypatch.setattr(config, "PROFILING_TOKEN", "")
+
+    monkeypatch.setattr(config, "PROFILING_SAMPLE_EVERY", 1)
+    sampled = client.post("/calculate", json=SCENARIOS)
+    assert client.get(f"/profiles/{sampled.headers['x-profile-id']}").json()["trigger"] == "sample"
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+
+def test_calculate_columnar_matches_object_format():
+    scenarios = SCENARIOS * 3 + [dict(SCENARIOS[0], name="Never", monthly_return_estimate=1000, development_months=6.0)]
+    columns = {field: [scenario[field] for scenario in scenarios] for field in (
+        "name", "investment_cost", "monthly_operational_cost", "num_people",
+        "development_months", "monthly_return_estimate", "time_to_results_months"
+    )}
+
+    expected = client.post("/calculate?projection_months=30", json=scenarios)
+    response = client.post("/calculate/columnar?projection_months=30", json=columns)
+    assert response.status_code == 200
+    assert response.content == expected.content
+
+    assert client.post("/calculate/columnar", json={**columns, "name": None}).json()[0]["name"] == "unknown"
+    empty = {field: [] for field in columns}
+    assert client.post("/calculate/columnar", json=empty).json() == []
+
+
+def test_calculate_columnar_validates_in_bulk():
+    columns = {
+        "investment_cost": [1000, 2000],
+        "monthly_operational_cost": [10, "x"],
+        "development_months": [2, 2.5],
+        "monthly_return_estimate": [50, 60],
+        "time_to_results_months": [3]
+    }
+    response = client.post("/calculate/columnar", json=columns)
+    assert response.status_code == 422
+    errors = {tuple(error["loc"]): error["type"] for error in response.json()["detail"]}
+    assert errors == {
+        ("body", "monthly_operational_cost"): "float_type",
+        ("body", "development_months"): "int_from_float",
+        ("body",): "length_mismatch"
+    }
+
+    columns.update(monthly_operational_cost=[10, 20], development_months=[2, 3])
+    mismatch = client.post("/calculate/columnar", json=columns).json()["detail"]
+    assert [error["type"] for error in mismatch] == ["length_mismatch"]
+
+    del columns["time_to_results_months"]
+    missing = client.post("/calculate/columnar", json=columns).json()["detail"]
+    assert missing == [{"loc": ["body", "time_to_results_months"], "msg": "Field required", "type": "missing"}]
+    assert client.post("/calculate/columnar", content=b"[1, 2").status_code == 422
+
+
+def test_calculate_msgpack_matches_json():
+    msgpack = pytest.importorskip("msgpack")
+    expected = client.post("/calculate?projection_months=24", json=SCENARIOS).json()
+
+    response = client.post("/calculate?projection_months=24", json=SCENARIOS, headers={"Accept": "application/msgpack"})
+    assert response.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(response.content) == expected
+
+    columns = {field: [scenario[field] for scenario in SCENARIOS] for field in ("name",) + main.SCENARIO_FIELDS}
+    columnar = client.post("/calculate/columnar?projection_months=24", json=columns, headers={"Accept": "application/x-msgpack"})
+    assert msgpack.unpackb(columnar.content) == expected
+
+
+def test_calculate_empty_batch():
+    assert client.post("/calculate", json=[]).json() == []
+    assert client.post("/calculate?fields=name,payback&series=yearly", json=[]).json() == []
+    empty_columns = {field: [] for field in ("name",) + main.SCENARIO_FIELDS}
+    assert client.post("/calculate/columnar?fields=name,monthly_profits", json=empty_columns).json() == []
+
+
+def test_calculate_response_shaping(monkeypatch):
+    full = client.post("/calculate?projection_months=26", json=SCENARIOS).json()
+
+    quarterly = client.post("/calculate?projection_months=26&series=quarterly&precision=1", json=SCENARIOS).json()
+    for shaped, reference in zip(quarterly, full):
+        months = [3, 6, 9, 12, 15, 18, 21, 24, 26]
+        assert shaped["monthly_profits"] == pytest.approx([reference["monthly_profits"][m - 1] for m in months], abs=0.051)
+        assert all(value == round(value, 1) for value in shaped["monthly_profits"])
+        assert shaped["roi"] == round(reference["roi"], 1)
+        assert shaped["break_even_month"] == reference["break_even_month"]
+    yearly = client.post("/calculate?projection_months=24&series=yearly", json=SCENARIOS).json()
+    assert [len(result["monthly_profits"]) for result in yearly] == [2, 2]
+
+    # Sem série nem break-even pedidos, nenhum dos dois é calculado
+    def not_expected(*args, **kwargs):
+        raise AssertionError("computed an output that was not requested")
+
+    monkeypatch.setattr(main, "project_scenarios", not_expected)
+    monkeypatch.setattr(main.ScenarioBatch, "_calculate_break_even_month", not_expected)
+    series_only = client.post("/calculate?projection_months=26&fields=monthly_profits", json=SCENARIOS).json()
+    assert series_only == [{"monthly_profits": result["monthly_profits"]} for result in full]
+    monkeypatch.setattr(main.ScenarioBatch, "cumulative_profits", not_expected)
+    slim = client.post("/calculate?projection_months=26&fields=name,roi,total_cost", json=SCENARIOS).json()
+    assert slim == [{key: result[key] for key in ("name", "roi", "total_cost")} for result in full]
+
+    columns = {field: [scenario[field] for scenario in SCENARIOS] for field in ("name",) + main.SCENARIO_FIELDS}
+    streamed = client.post("/calculate/columnar?projection_months=26&series=none&fields=roi,total_return", json=columns).json()
+    assert streamed == [{"roi": result["roi"], "total_return": result["total_return"]} for result in full]
+
+    assert client.post("/calculate?fields=roi,bogus", json=SCENARIOS).status_code == 422
+    assert client.post("/calculate?fields=monthly_profits&series=none", json=SCENARIOS).status_code == 422
+
+
+def test_conditional_requests_skip_recomputation(monkeypatch):
+    first = client.post("/export/csv?projection_months=24", json=SCENARIOS, headers={"Accept-Encoding": "identity"})
+    tag = first.headers["etag"]
+    assert tag.startswith('"') and not tag.startswith('W/')
+    assert client.post("/export/csv?projection_months=24", json=SCENARIOS).headers["etag"].strip('"').startswith(tag.strip('"'))
+    assert client.post("/export/csv?projection_months=36", json=SCENARIOS).headers["etag"] != tag
+    calculate_tag = client.post("/calculate?projection_months=24", json=SCENARIOS, headers={"Accept-Encoding": "identity"}).headers["etag"]
+    assert client.post("/calculate?projection_months=24&precision=2", json=SCENARIOS).headers["etag"] != calculate_tag
+
+    def not_expected(*args, **kwargs):
+        raise AssertionError("recomputed a response the client already has")
+
+    monkeypatch.setattr(main, "_project", not_expected)
+    monkeypatch.setattr(main, "_results", not_expected)
+    revalidated = client.post("/export/csv?projection_months=24", json=SCENARIOS, headers={"If-None-Match": f'"other", {tag[:-1]}-gzip"'})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == f'{tag[:-1]}-gzip"' and revalidated.content == b""
+    assert client.post("/calculate?projection_months=24", json=SCENARIOS, headers={"If-None-Match": calculate_tag}).headers["etag"] == calculate_tag
+
+    # O PDF traz a data de geração, então a ETag é fraca
+    monkeypatch.setattr(main, "_pdf_rows", not_expected)
+    pdf_tag = main.http_cache.etag("/export/pdf", main.request_fingerprint(
+        [main.ROIInput(**scenario) for scenario in SCENARIOS], projection_months=24), weak=True)
+    assert pdf_tag.startswith('W/"')
+    pdf = client.post("/export/pdf?projection_months=24", json=SCENARIOS, headers={"If-None-Match": pdf_tag[2:]})
+    assert pdf.status_code == 304 and pdf.headers["etag"] == pdf_tag[2:]
+
+
+def test_compression_negotiation():
+    brotli = pytest.importorskip("brotli")
+    scenarios = [dict(SCENARIOS[0], name=f"Scenario {i}") for i in range(50)]
+    plain = client.post("/export/csv?projection_months=60", json=scenarios, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+
+    compressed = client.stream("POST", "/export/csv?projection_months=60", json=scenarios, headers={"Accept-Encoding": "gzip;q=0.5, br"})
+    with compressed as response:
+        raw = b"".join(response.iter_raw())
+        assert response.headers["content-encoding"] == "br"
+        assert response.headers["etag"] == plain.headers["etag"][:-1] + '-br"'
+    assert brotli.decompress(raw) == plain.content
+    assert len(raw) < len(plain.content) / 5
+
+    gzipped = client.post("/calculate?projection_months=60", json=scenarios, headers={"Accept-Encoding": "gzip, br;q=0"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.json() == client.post("/calculate?projection_months=60", json=scenarios, headers={"Accept-Encoding": "identity"}).json()
+
+    small = client.post("/calculate?projection_months=1&fields=roi", json=SCENARIOS[:1], headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    pdf = client.post("/export/pdf", json=SCENARIOS, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in pdf.headers and pdf.headers["etag"].startswith('W/"')
+
+
+def test_calculate_chart_series():
+    scenarios = SCENARIOS + [dict(SCENARIOS[0], name="Free", investment_cost=0, monthly_operational_cost=0)]
+    full = client.post("/calculate?projection_months=30", json=scenarios).json()
+    assert "payback" not in full[0] and "roi_over_time" not in full[0]
+
+    fields = "name,total_cost,roi_over_time,payback"
+    charted = client.post(f"/calculate?projection_months=30&fields={fields}", json=scenarios).json()
+    for result, reference in zip(charted, full):
+        # Mesmas contas que o frontend fazia em Python, mês a mês
+        cost = reference["total_cost"]
+        expected_roi = [(profit / cost) * 100 if cost > 0 else 0 for profit in reference["monthly_profits"]]
+        expected_payback, cumulative = [], 0
+        for profit in reference["monthly_profits"]:
+            cumulative += profit
+            expected_payback.append(cumulative - cost)
+        assert result["roi_over_time"] == expected_roi
+        assert result["payback"] == expected_payback
+
+    columns = {field: [scenario[field] for scenario in scenarios] for field in ("name",) + main.SCENARIO_FIELDS}
+    yearly = client.post(f"/calculate/columnar?projection_months=30&series=yearly&fields={fields}", json=columns).json()
+    assert [point for point in yearly[0]["payback"]] == [charted[0]["payback"][m - 1] for m in (12, 24, 30)]
+
+
+def test_live_websocket_coalesces_deltas(monkeypatch):
+    monkeypatch.setattr(config, "LIVE_DEBOUNCE_MS", 100)
+    with client.websocket_connect("/ws/calculate") as websocket:
+        websocket.send_json({"type": "update", "seq": 0, "changes": []})
+        assert websocket.receive_json()["type"] == "error"
+
+        websocket.send_json({"type": "init", "seq": 1, "scenarios": SCENARIOS, "projection_months": 24, "fields": "name,roi,break_even_month"})
+        first = websocket.receive_json()
+        assert first["seq"] == 1
+        assert first["results"] == client.post("/calculate?projection_months=24&fields=name,roi,break_even_month", json=SCENARIOS).json()
+
+        # Rajada de deltas de um slider: um único recálculo com o estado final
+        for seq, investment in enumerate(range(100000, 150001, 10000), start=2):
+            websocket.send_json({"type": "update", "seq": seq, "changes": [{"index": 0, "values": {"investment_cost": investment}}]})
+        websocket.send_json({"type": "update", "seq": 8, "projection_months": 36})
+        update = websocket.receive_json()
+        assert update["type"] == "result" and update["seq"] == 8
+
+        final = [dict(SCENARIOS[0], investment_cost=150000), SCENARIOS[1]]
+        assert update["results"] == client.post("/calculate?projection_months=36&fields=name,roi,break_even_month", json=final).json()
+
+        websocket.send_json({"type": "update", "seq": 9, "changes": [{"index": 5, "values": {}}]})
+        assert websocket.receive_json() == {"type": "error", "seq": 9, "detail": "Unknown scenario index: 5"}
+        websocket.send_json({"type": "update", "seq": 10, "changes": [{"index": 1, "values": {"development_months": "soon"}}]})
+        assert websocket.receive_json()["type"] == "error"
+
+
+def test_live_websocket_rejects_malformed_messages():
+    with client.websocket_connect("/ws/calculate") as websocket:
+        websocket.send_text("{not json")
+        assert websocket.receive_json()["type"] == "error"
+        websocket.send_json({"type": "init", "seq": 0, "scenarios": [1]})
+        assert websocket.receive_json() == {"type": "error", "seq": 0, "detail": "Each scenario must be an object"}
+        websocket.send_json({"type": "init", "seq": 1, "scenarios": SCENARIOS, "fields": ["roi"]})
+        assert websocket.receive_json() == {"type": "error", "seq": 1, "detail": "fields must be a comma-separated string"}
+        for seq, precision in ((2, "x"), (3, -3), (4, 16), (5, True)):
+            websocket.send_json({"type": "init", "seq": seq, "scenarios": SCENARIOS, "precision": precision})
+            assert websocket.receive_json() == {"type": "error", "seq": seq, "detail": "precision must be an integer between 0 and 15"}
+
+        websocket.send_json({"type": "init", "seq": 6, "scenarios": SCENARIOS, "fields": "name,roi", "precision": 2})
+        assert websocket.receive_json()["results"] == client.post("/calculate?fields=name,roi&precision=2", json=SCENARIOS).json()
+        for seq, changes in ((7, ["oops"]), (8, [{"index": 0, "values": [1]}]), (9, {"index": 0})):
+            websocket.send_json({"type": "update", "seq": seq, "changes": changes})
+            assert websocket.receive_json()["type"] == "error"
+        websocket.send_bytes(b"\xff")
+        assert websocket.receive_json()["type"] == "error"
+
+        # A conexão continua viva depois dos erros
+        websocket.send_json({"type": "update", "seq": 10, "projection_months": 12})
+        assert websocket.receive_json()["seq"] == 10
+
+
+def test_health_and_readiness_after_warm_up(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "readiness", main.Readiness(main.WARM_UP_CHECKS))
+    monkeypatch.setattr(main, "export_jobs", JobStore(str(tmp_path / "jobs")))
+    monkeypatch.setattr(config, "PDF_RENDER_WORKERS", 0)
+    monkeypatch.setattr(config, "PROCESS_POOL_WORKERS", 1)
+
+    assert client.get("/healthz").json() == {"status": "ok"}
+    pending = client.get("/readyz")
+    assert pending.status_code == 503
+    assert pending.json()["checks"]["result_cache"] == {"ok": False, "detail": "pending"}
+
+    main.warm_up()
+    ready = client.get("/readyz")
+    assert ready.status_code == 200
+    assert set(ready.json()["checks"]) == set(main.WARM_UP_CHECKS)
+    assert (tmp_path / "jobs").is_dir()
+
+    # Uma etapa que falha mantém o worker fora do balanceador
+    monkeypatch.setattr(main, "_warm_pdf_renderer", lambda: 1 / 0)
+    main.warm_up()
+    failed = client.get("/readyz")
+    assert failed.status_code == 503
+    assert failed.json()["checks"]["pdf_renderer"]["detail"].startswith("ZeroDivisionError")
+
+
+def test_pdf_pool_keeps_report_engines_out_of_the_api_worker():
+    # Aquecimento (a cada início ou reciclagem de worker), download direto e job de exportação:
+    # o ReportLab só é carregado nos processos do pool
+    code = (
+        "import io, sys, json, main, pools\n"
+        "from fastapi.testclient import TestClient\n"
+        "main._warm_pdf_renderer()\n"
+        f"scenarios = {SCENARIOS!r}\n"
+        "assert TestClient(main.app).post('/export/pdf', json=scenarios).content.startswith(b'%PDF')\n"
+        "output = io.BytesIO()\n"
+        "main._pdf_export_task([main.ROIInput(**s) for s in scenarios], 24)(output, lambda fraction: None)\n"
+        "assert output.getvalue().startswith(b'%PDF')\n"
+        "print(json.dumps(sorted(sys.modules))); pools.shutdown()"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.dirname(main.__file__),
+        env=dict(os.environ, ROI_PDF_RENDER_WORKERS="1"),
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    loaded = set(json.loads(completed.stdout))
+    assert not {"reportlab", "pdf_report"} & loaded
+
+
+def test_server_options(monkeypatch):
+    import server
+
+    monkeypatch.setattr(config, "SERVER_WORKERS", 0)
+    monkeypatch.setattr(config, "SERVER_MAX_REQUESTS", 0)
+    settings = server.options()
+    assert settings["app"] == "main:app"
+    assert settings["workers"] == 1
+    assert settings["limit_max_requests"] is None
+    assert settings["loop"] in ("uvloop", "asyncio") and settings["http"] in ("httptools", "h11")
+
+
+def test_server_splits_cores_between_worker_pools(monkeypatch):
+    import pools
+    import server
+
+    monkeypatch.delenv("ROI_PROCESS_POOL_WORKERS", raising=False)
+    monkeypatch.setattr(config, "PROCESS_POOL_WORKERS", config.PROCESS_POOL_WORKERS)
+    monkeypatch.setattr(server.os, "cpu_count", lambda: 8)
+    assert server.split_process_pool(4) == 2
+    try:
+        assert pools.process_pool()._max_workers == 2
+    finally:
+        pools.shutdown()
+
+    # Workers novos leem o mesmo tamanho
+    spawned = subprocess.run(
+        [sys.executable, "-c", "import config; print(config.PROCESS_POOL_WORKERS)"],
+        cwd=server.BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    assert spawned.stdout.strip() == "2"
+
+    # Um tamanho fixado pelo operador é respeitado
+    monkeypatch.setenv("ROI_PROCESS_POOL_WORKERS", "3")
+    monkeypatch.setattr(config, "PROCESS_POOL_WORKERS", 3)
+    assert server.split_process_pool(4) == 3
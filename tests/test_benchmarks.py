@@ -0,0 +1,26 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks"))
+
+from bench_suite import compare, run_suite  # noqa: E402
+from bench_serialization import run as run_serialization  # noqa: E402
+
+
+def test_bench_suite_compare_flags_regressions():
+    current = run_suite([1, 10], [12], repeat=1, warm_cache=False, only=["estimate_roi", "api_calculate"])
+    assert {(r["case"], r["scenarios"]) for r in current["results"]} == {
+        ("estimate_roi", 1), ("estimate_roi", 10), ("api_calculate", 1), ("api_calculate", 10)
+    }
+
+    faster = {"results": [dict(r, median_s=r["median_s"] / 10) for r in current["results"]]}
+    slower = {"results": [dict(r, median_s=r["median_s"] * 10) for r in current["results"]]}
+    assert len(compare(current, faster, tolerance=0.25)) == 4
+    assert compare(current, slower, tolerance=0.25) == []
+
+
+def test_serialization_benchmark_reports_share_per_encoder():
+    report = run_serialization([200], [120], repeat=1)
+    by_encoder = {r["encoder"]: r for r in report["results"]}
+    assert by_encoder["json"]["bytes"] == by_encoder["fastapi_default"]["bytes"]
+    assert all(0 < r["serialize_share"] < 1 for r in report["results"])
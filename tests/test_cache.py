@@ -0,0 +1,48 @@
+from cache import ResultCache, scenario_key
+from models import ROIInput
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _scenario(**overrides):
+    fields = {
+        "name": "a",
+        "investment_cost": 10000,
+        "monthly_operational_cost": 2000,
+        "num_people": 3,
+        "development_months": 3,
+        "monthly_return_estimate": 5000,
+        "time_to_results_months": 4
+    }
+    fields.update(overrides)
+    return ROIInput(**fields)
+
+
+def test_scenario_key_ignores_fields_outside_the_model():
+    base = scenario_key(_scenario(), 24)
+    assert scenario_key(_scenario(name="b", num_people=9, technologies=["Spark"]), 24) == base
+    assert scenario_key(_scenario(investment_cost=10000.0), 24) == base
+    assert scenario_key(_scenario(investment_cost=10001), 24) != base
+    assert scenario_key(_scenario(), 36) != base
+
+
+def test_lru_eviction_and_ttl():
+    clock = FakeClock()
+    cache = ResultCache(max_size=2, ttl_seconds=10, clock=clock)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)  # "b" é o menos usado
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    clock.now = 11
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["expirations"]) == (2, 2, 1, 1)
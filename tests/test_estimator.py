@@ -1,4 +1,8 @@
-from backend.estimator import DataInitiativeROI
+import csv
+import io
+import random
+
+from backend.estimator import DataInitiativeROI, ScenarioBatch, project_scenarios
 
 def test_basic_roi_calculation():
     model = DataInitiativeROI(
@@ -13,3 +17,127 @@ def test_basic_roi_calculation():
     assert result["total_cost"] == 10000 + (3 * 2000)
     assert result["roi"] > 0
     assert result["break_even_month"] > 0
+
+
+def _random_models(count, seed=0, integral=True):
+    rng = random.Random(seed)
+    models = []
+    for _ in range(count):
+        money = (lambda a, b: float(rng.randint(a, b))) if integral else rng.uniform
+        models.append(DataInitiativeROI(
+            investment_cost=money(0, 200000),
+            monthly_operational_cost=money(0, 50000),
+            num_people=rng.randint(1, 10),
+            development_months=rng.randint(0, 24),
+            monthly_return_estimate=money(0, 90000),
+            time_to_results_months=rng.randint(0, 36)
+        ))
+    return models
+
+
+def _reference_projection(model, projection_months):
+    # Cálculo original por cenário (antes do ScenarioBatch), usado como referência
+    total_cost = model.investment_cost + (model.monthly_operational_cost * model.development_months)
+    profit_months = max(projection_months - model.time_to_results_months, 0)
+    total_return = profit_months * model.monthly_return_estimate
+    roi = (total_return - total_cost) / total_cost if total_cost else 0
+
+    monthly_profits = []
+    profit = 0
+    cost = model.investment_cost
+    for i in range(1, projection_months + 1):
+        if i <= model.development_months:
+            cost += model.monthly_operational_cost
+        elif i >= model.time_to_results_months:
+            profit += model.monthly_return_estimate - model.monthly_operational_cost
+        else:
+            cost += model.monthly_operational_cost
+        monthly_profits.append(profit - cost)
+
+    return {"total_cost": total_cost, "total_return": total_return, "roi": roi}, monthly_profits
+
+
+def test_scenario_batch_matches_per_scenario_path():
+    models = _random_models(200, integral=False) + _random_models(200, seed=1)
+    batch = ScenarioBatch.from_scenarios(models)
+
+    for projection_months in (1, 24, 60, 120):
+        roi_data = batch.estimate_roi(projection_months)
+        monthly_profits = batch.cumulative_profits(projection_months)
+        assert monthly_profits.shape == (len(models), projection_months)
+
+        for i, model in enumerate(models):
+            expected, expected_profits = _reference_projection(model, projection_months)
+            for key in ("total_cost", "total_return", "roi"):
+                assert roi_data[key][i] == expected[key]
+            assert roi_data["break_even_month"][i] == model._calculate_break_even_month()
+            assert monthly_profits[i].tolist() == expected_profits
+
+
+def test_projection_is_shared_across_outputs():
+    model = _random_models(1, seed=3)[0]
+    projection = model.projection(36)
+    assert model.projection(36) is projection
+    assert model.estimate_roi(36) == projection.summary()
+
+    expected, expected_profits = _reference_projection(model, 36)
+    rows = list(csv.reader(io.StringIO(model.export_to_csv(36))))[1:]
+    assert [float(profit) for _, profit in rows] == expected_profits
+
+    models = _random_models(5, seed=4) + [model]
+    projections = project_scenarios(models, 36)
+    assert projections[-1] is projection
+    assert [p.summary() for p in projections] == [m.estimate_roi(36) for m in models]
+
+
+def test_scenario_batch_empty():
+    batch = ScenarioBatch.from_scenarios([])
+    assert batch.cumulative_profits(12).shape == (0, 12)
+    assert batch.estimate_roi(12)["roi"].shape == (0,)
+
+
+def test_break_even_solver_matches_reference_loop():
+    models = _random_models(2000, seed=2)
+    # inclui cenários degenerados: sem investimento, custo zero e retorno igual ao custo
+    models.append(DataInitiativeROI(0, 0, 1, 0, 0, 0))
+    models.append(DataInitiativeROI(1000, 0, 1, 3, 0, 2))
+    models.append(DataInitiativeROI(1000, 500, 1, 3, 500, 2))
+    # valores fracionários: em quase-empates a fórmula fechada e a soma mês a mês divergiam por um mês
+    models.append(DataInitiativeROI(0, 0.2, 1, 11, 0.3, 6))
+    models += _random_models(200, seed=3, integral=False)
+    rng = random.Random(4)
+    for _ in range(1000):
+        step = rng.choice([0.01, 0.05, 0.1, 0.25, 1 / 3])
+        models.append(DataInitiativeROI(
+            rng.randint(0, 30) * step, rng.randint(0, 10) * step, 1, rng.randint(0, 24), rng.randint(0, 20) * step, rng.randint(0, 36)
+        ))
+
+    # o break-even da resposta bate com o primeiro mês não negativo da série monthly_profits
+    batch = ScenarioBatch.from_scenarios(models)
+    break_even = batch.estimate_roi(120)["break_even_month"]
+    profits = batch.cumulative_profits(120)
+    for month, row in zip(break_even, profits):
+        reached = row >= 0
+        assert (month if month <= 120 else -1) == (int(reached.argmax()) + 1 if reached.any() else -1)
+
+    for model in models:
+        for horizon in (12, 60, 120, 600):
+            assert model._calculate_break_even_month(horizon) == model._calculate_break_even_month_reference(horizon)
+
+        exact = model._calculate_break_even_month()
+        reference = model._calculate_break_even_month_reference(600)
+        assert exact == reference or (reference == -1 and (exact == -1 or exact > 600))
+
+
+def test_break_even_after_five_years():
+    model = DataInitiativeROI(
+        investment_cost=500000,
+        monthly_operational_cost=1000,
+        num_people=2,
+        development_months=6,
+        monthly_return_estimate=6000,
+        time_to_results_months=7
+    )
+    assert model._calculate_break_even_month_reference(60) == -1
+    assert model.estimate_roi(120)["break_even_month"] == model._calculate_break_even_month_reference(120) == 108
+    assert model._calculate_break_even_month(horizon=60) == -1
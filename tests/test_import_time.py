@@ -0,0 +1,13 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks"))
+
+from import_time import measure  # noqa: E402
+
+
+def test_report_engines_are_not_loaded_at_startup():
+    for module in ("main", "estimator"):
+        result = measure(module)
+        assert result["lazy_modules_loaded"] == []
+        assert result["total_ms"] < float(os.getenv("ROI_IMPORT_BUDGET_MS", "5000"))